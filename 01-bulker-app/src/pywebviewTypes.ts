@@ -8,6 +8,7 @@ export type APISettings = {
     output_dir: string,
     flatten_csv: boolean,
     two_name_column_support: boolean,
+    username_index: boolean,
     template: TemplateMap,
     format: Formatting,
     password: Password,
@@ -23,6 +24,8 @@ export type HeaderMap = {
 export type TemplateMap = {
     enabled: boolean,
     text: string,
+    workers: number,
+    archive: "none" | "zip" | "tar",
 }
 
 export type Formatting = {
@@ -1,18 +1,24 @@
 from core.json_reader import Reader
 from core.parser import Parser
-from core.azure_writer import AzureWriter
+from core.azure_writer import AzureWriter, TemplateArchive
+from core.csv_reader import read_csv
+from core.excel_reader import read_excel
+from core.names import NameCache
+from core.username_index import UsernameIndex, number_usernames
 from support.types import GenerateCSVProps, ManualCSVProps, APISettings, Response, HeaderMap
-from support.types import Password, Formatting, TemplateMap, Metadata
+from support.types import Password, Formatting, TemplateMap, Metadata, CacheStats, OpcoResolution, OpcoReport
 from base64 import b64decode
 from io import BytesIO
 from logger import Log
+from logging import DEBUG
 from pathlib import Path
-from typing import Any, Literal, TypedDict, Callable
+from typing import Any, Literal, TypedDict, Callable, Iterable, Iterator
 from support.vars import DEFAULT_SETTINGS_MAP, PROJECT_ROOT, META, UPDATER_PATH, VERSION
+from support.vars import NAME_CACHE_SIZE, USERNAME_INDEX_FILE
 from copy import deepcopy
 import support.utils as utils
 import pandas as pd
-import webview, os
+import webview, os, sqlite3
 
 ReaderType = Literal["excel", "opco", "settings"]
 AzureFileState = TypedDict(
@@ -75,6 +81,13 @@ class API:
 
         self._project_root: Path = project_root
 
+        # formatted names are keyed by the raw name, usernames are keyed by the name and format settings.
+        self.name_cache: NameCache = NameCache(NAME_CACHE_SIZE)
+        self.username_cache: NameCache = NameCache(NAME_CACHE_SIZE)
+
+        # created when used, see API._get_username_index()
+        self._username_index: UsernameIndex = None
+
         # state tracking for generate_azure_csv
         self._auto_azure_state: AzureFileState = {
             "upload_id": "", 
@@ -83,7 +96,8 @@ class API:
             "uid": "",
         }
 
-    def generate_azure_csv(self, content: GenerateCSVProps | pd.DataFrame, upload_id: str = None) -> Response: 
+    def generate_azure_csv(self, content: GenerateCSVProps | pd.DataFrame, upload_id: str = None, *, 
+            chunk_size: int = None) -> Response: 
         '''Generates the Azure CSV file for bulk accounts.
         
         Parameters
@@ -95,15 +109,27 @@ class API:
             upload_id: str, default None
                 The upload ID for each file. It is used to keep track of each file and write to the
                 correct file. This is only relevant if flatten CSV is enabled.
+            
+            chunk_size: int, default None
+                The amount of rows read at a time from a CSV file. Each chunk goes through the entire
+                pipeline before the next one is read, so the memory used is bounded by the chunk size instead
+                of the file size. By default it is None, using `CSV_CHUNK_SIZE`. Excel files and DataFrames
+                are always read as one chunk.
         '''
         res: Response = utils.generate_response(message="CSV generated")
-        df: pd.DataFrame = None
+        frames: Iterable[pd.DataFrame] = None
+        file_name: str = "DataFrame"
+
+        # the readers must be up to date before the mapped columns are read.
+        self._reload_readers()
 
         if isinstance(content, dict):
-            delimited: list[str] = content['b64'].split(',')
-            file_name: str = content['fileName']
+            b64: str = content['b64']
+            file_name = content['fileName']
 
-            meta_info: str = delimited[0]
+            # the data URL is not split to avoid copying the entire base64 string.
+            sep: int = b64.find(',')
+            meta_info: str = b64[:sep] if sep != -1 else b64
 
             self.logger.info(f"Received file {file_name}: {meta_info}")
             if all(file_type not in meta_info.lower() for file_type in ["spreadsheet", "csv"]):
@@ -113,151 +139,229 @@ class API:
             
             is_excel: bool = "spreadsheet" in meta_info
 
-            b64_string: str = delimited[-1]
-            decoded_data: bytes = b64decode(b64_string)
-            in_mem_bytes: BytesIO = BytesIO(decoded_data)
-
             try:
                 if is_excel:
-                    df = pd.read_excel(in_mem_bytes)
+                    # only the mapped columns are parsed, the rest of the sheet is skipped.
+                    frames = [read_excel(BytesIO(b64decode(b64[sep + 1:])), self.excel.get_content().values())]
                 else:
-                    df = pd.read_csv(in_mem_bytes)
+                    frames = read_csv(b64, sep + 1, self.excel.get_content().values(), chunk_size=chunk_size)
             except Exception as e:
                 self.logger.critical(f"Failed to parse file: {file_name} | {meta_info}")
                 self.logger.critical(f"Exception: {e}")
 
                 return utils.generate_response("error", message=f"An unknown error occurred while parsing {file_name}")
-
-            self.logger.info(f"File column names: {df.columns.to_list()}")
         else:
-            df = content
+            frames = [content]
 
         if upload_id is None:
             upload_id = utils.get_id(divisor=2)
 
-        parser: Parser = Parser(df)
-        base_len: int = parser.length
-
-        if base_len == 0:
-            res["status"] = "error"
-            res["message"] = "File is empty"
-            
-            return res
-        
         # the user defined headers (values).
         # the key is the internal name, the value is the user defined columns.
         # however there are only two required keys: name and opco.
         excel_columns: HeaderMap = self.excel.get_content()
         settings: APISettings = self.settings.get_content()
+        templates: TemplateMap = self.settings.get("template")
+        output_dir: Path = Path(self.get_reader_value("settings", "output_dir"))
 
         self.logger.debug(f"Headers: {excel_columns}")
-        validate_dict: Response = self._validate_df(
-            df,
-            excel_columns,
-            two_name_column_support=settings["two_name_column_support"],
-        )
 
-        if validate_dict["status"] == "error":
-            self.logger.error(f"Error validating DataFrame, message: {validate_dict['message']}")
-            return validate_dict
-        
-        # creating the name series and adding it into the DataFrame for normalization
-        # only if using two name columns
-        if settings["two_name_column_support"]:
-            full_name_series: pd.Series = parser.create_series(
-                func=self._concat_full_name,
-                args=(parser.df[excel_columns["first_name"]], parser.df[excel_columns["last_name"]])
-            )
+        base_len: int = 0
+        dropped_rows: int = 0
+        validated: bool = False
+        csv_name: str = None
+        temp_res: Response = None
+        # the rows and text files already written, reported if a later chunk fails.
+        written_rows: int = 0
+        template_count: int = 0
+        # the text files of all chunks are added to one archive, it is moved into the templates folder at the end.
+        template_archive: TemplateArchive = None
+
+        # shared between chunks, duplicate names can be split across chunks.
+        seen_names: dict[str, int] = {}
+        opco_report: OpcoReport = {"counts": {}, "unknown": []}
+
+        frame_iter: Iterator[pd.DataFrame] = iter(frames)
+
+        try:
+            while True:
+                try:
+                    df: pd.DataFrame = next(frame_iter, None)
+                except Exception as e:
+                    self.logger.critical(f"Failed to parse file: {file_name}")
+                    self.logger.critical(f"Exception: {e}")
+
+                    # the text files of the previous chunks are kept with their rows.
+                    if not self._commit_template_archive(template_archive):
+                        template_count = 0
+
+                    return utils.generate_response("error", message=self._get_partial_message(
+                        f"An unknown error occurred while parsing {file_name}", file_name, csv_name, written_rows, template_count
+                    ))
+
+                if df is None:
+                    break
+
+                parser: Parser = Parser(df)
+                chunk_len: int = parser.length
+
+                # validated on the first chunk even if it is empty, a file without any of the
+                # mapped columns must report the missing columns.
+                if not validated:
+                    validated = True
+                    self.logger.info(f"File column names: {df.columns.to_list()}")
+
+                    validate_dict: Response = self._validate_df(
+                        df,
+                        excel_columns,
+                        two_name_column_support=settings["two_name_column_support"],
+                    )
+
+                    if validate_dict["status"] == "error":
+                        self.logger.error(f"Error validating DataFrame, message: {validate_dict['message']}")
+                        return validate_dict
+
+                if chunk_len == 0:
+                    continue
+
+                base_len += chunk_len
+            
+                # creating the name series and adding it into the DataFrame for normalization
+                # only if using two name columns
+                if settings["two_name_column_support"]:
+                    full_name_series: pd.Series = parser.create_series(
+                        func=self._concat_full_name,
+                        args=(parser.df[excel_columns["first_name"]], parser.df[excel_columns["last_name"]])
+                    )
+
+                    parser.add(excel_columns["name"], full_name_series)
+
+                # maybe read this back? for now i want to keep the full name.
+                #parser.apply(default_excel_columns["name"], func=utils.format_name)
+
+                # drops empty rows and ensures only strings are being worked with here. 
+                dropped_dict: dict[str, int] = parser.clean(
+                    [excel_columns["name"], excel_columns["opco"]], 
+                    lower=[excel_columns["opco"]],
+                )
+                dropped_name_rows: int = dropped_dict[excel_columns["name"]]
+                dropped_opco_rows: int = dropped_dict[excel_columns["opco"]]
 
-            parser.add(excel_columns["name"], full_name_series)
+                dropped_rows += dropped_name_rows + dropped_opco_rows
 
-        # maybe read this back? for now i want to keep the full name.
-        #parser.apply(default_excel_columns["name"], func=utils.format_name)
+                self.logger.debug(f"Dropped names: {dropped_name_rows}/{chunk_len}")
+                self.logger.debug(f"Dropped opcos: {dropped_opco_rows}/{chunk_len}")
 
-        # converting all values to a string to ensure no errors occur.
-        parser.apply(excel_columns["opco"], func=lambda x: x.lower())
-        
-        dropped_name_rows: int = parser.drop_empty_rows(excel_columns["name"])
-        dropped_opco_rows: int = parser.drop_empty_rows(excel_columns["opco"])
+                if parser.length == 0:
+                    continue
 
-        dropped_rows: int = dropped_name_rows + dropped_opco_rows
+                excel_names: list[str] = parser.get_rows(excel_columns["name"])
+                opcos: list[str] = parser.get_rows(excel_columns["opco"])
 
-        new_len: int = parser.length
+                self.logger.lazy(DEBUG, "Name DF columns: %s", excel_names)
+                self.logger.lazy(DEBUG, "Opco DF columns: %s", opcos)
 
-        self.logger.debug(f"Dropped names: {dropped_name_rows}/{base_len}")
-        self.logger.debug(f"Dropped opcos: {dropped_opco_rows}/{base_len}")
-        self.logger.debug(f"Total dropped rows: {dropped_rows}/{base_len}")
+                names, full_names = utils.format_names(excel_names, cache=self.name_cache)
 
-        if new_len == 0:
-            res["status"] = "error"
-            res["message"] = f"File is empty after validation ({dropped_rows}/{base_len} dropped rows), please correct the data"
+                dupe_names: list[str] = self._check_duplicate_names(names, seen_names=seen_names)
 
-            return res
+                # the mapping of the operating company to their domain name.
+                opco_mappings: dict[str, str] = self.opco.get_content()
 
-        if dropped_rows > 0:
-            rows_str: str = "rows" if dropped_rows > 1 else "row"
-            res["message"] += f", dropped {dropped_rows}/{base_len} {rows_str} from file due to missing values"
+                resolution: OpcoResolution = utils.resolve_opcos(opcos, opco_mappings)
+                self._add_opco_report(opco_report, resolution)
 
-        # ensure only strings are being worked with here. 
-        parser.apply(excel_columns["name"], func=lambda x: str(x))
-        parser.apply(excel_columns["opco"], func=lambda x: str(x))
+                formatters: Formatting = self.settings.get("format")
+                usernames: list[str] = utils.generate_usernames(
+                    dupe_names, opcos, opco_mappings,
+                    format_type=formatters["format_type"],
+                    format_case=formatters["format_case"], 
+                    format_style=formatters["format_style"],
+                    cache=self.username_cache,
+                    resolution=resolution,
+                )
 
-        excel_names: list[str] = parser.get_rows(excel_columns["name"])
-        opcos: list[str] = parser.get_rows(excel_columns["opco"])
+                usernames = self._assign_usernames(usernames)
 
-        self.logger.debug(f"Name DF columns: {excel_names}")
-        self.logger.debug(f"Opco DF columns: {opcos}")
+                writer: AzureWriter = self._get_azure_writer(full_names=full_names, usernames=usernames, names=names)
 
-        names: list[str] = [utils.format_name(name) for name in excel_names]
-        full_names: list[str] = [utils.format_name(name, keep_full=True) for name in excel_names]
+                if csv_name is None:
+                    csv_name = self._get_csv_name(upload_id)
+                
+                write_res: Response = writer.write(output_dir / csv_name, skip_version=self._auto_azure_state["skip_version_row"])
+                self._index_usernames(write_res, usernames)
 
-        dupe_names: list[str] = utils.check_duplicate_names(names)
+                # the remaining chunks are not written, the rows of the CSV must stay in the order of the file.
+                if write_res["status"] != "success":
+                    if not self._commit_template_archive(template_archive):
+                        template_count = 0
 
-        # the mapping of the operating company to their domain name.
-        opco_mappings: dict[str, str] = self.opco.get_content()
+                    return utils.generate_response("error", message=self._get_partial_message(
+                        write_res["message"], file_name, csv_name, written_rows, template_count
+                    ))
 
-        formatters: Formatting = self.settings.get("format")
-        usernames: list[str] = utils.generate_usernames(
-            dupe_names, opcos, opco_mappings,
-            format_type=formatters["format_type"],
-            format_case=formatters["format_case"], 
-            format_style=formatters["format_style"],
-        )
+                written_rows += len(usernames)
 
-        writer: AzureWriter = self._get_azure_writer(full_names=full_names, usernames=usernames, names=names)
+                # only applicable if flatten_csv is true. multi-file operations are not affected by this.
+                # this also makes the remaining chunks of the file append to the same CSV.
+                # NOTE: flatten csv condition is only used in the front end. it is not used in the backend
+                self._auto_azure_state["skip_version_row"] = True
 
-        curr_date: str = utils.get_date()
+                # any template failure stops the generation for the remaining chunks.
+                if templates["enabled"] and (temp_res is None or temp_res["status"] != "error"):
+                    if template_archive is None:
+                        template_archive = self._get_template_archive(self._auto_azure_state["template_name"])
 
-        # determines whether or not to create a new file or append to an existing file
-        if upload_id != self._auto_azure_state["upload_id"]:
-            # this is always reset on every run (assuming no flatten csv).
-            self._auto_azure_state["upload_id"] = upload_id
-            self._auto_azure_state["skip_version_row"] = False
+                    temp_res = self._generate_template(
+                        templates["text"], writer, self._auto_azure_state["template_name"], out_archive=template_archive
+                    )
 
-            self._auto_azure_state["uid"] = utils.get_id()
-            csv_name: str = f"{curr_date}-az-bulk-{self._auto_azure_state['uid']}.csv"
+                    if temp_res["status"] == "success":
+                        template_count += len(usernames)
+                    elif template_archive is not None:
+                        # the failed write can leave the archive broken, the archive in the templates folder is kept as is.
+                        template_archive.close()
+                        template_count = 0
 
-            self._auto_azure_state["csv_file_name"] = csv_name
-            self._auto_azure_state["template_name"] = f"{curr_date}-{self._auto_azure_state['uid']}"
-        else:
-            csv_name: str = self._auto_azure_state["csv_file_name"]
+            if not self._commit_template_archive(template_archive):
+                temp_res = utils.generate_response("error", message=", failed to generate text files")
+                template_count = 0
+        finally:
+            # removes the archive if it was not committed, e.g. on an unexpected exception.
+            if template_archive is not None:
+                template_archive.close()
+
+        if base_len == 0:
+            res["status"] = "error"
+            res["message"] = "File is empty"
             
-        writer.write(Path(self.get_reader_value("settings", "output_dir")) 
-            / csv_name, skip_version=self._auto_azure_state["skip_version_row"])
+            return res
 
-        # only applicable if flatten_csv is true. multi-file operations are not affected by this.
-        # NOTE: flatten csv condition is only used in the front end. it is not used in the backend
-        self._auto_azure_state["skip_version_row"] = True
+        self.logger.debug(f"Total dropped rows: {dropped_rows}/{base_len}")
 
-        self.logger.info(f"Generated {csv_name} at {self.get_reader_value('settings', 'output_dir')}")
+        if csv_name is None:
+            res["status"] = "error"
+            res["message"] = f"File is empty after validation ({dropped_rows}/{base_len} dropped rows), please correct the data"
 
-        templates: TemplateMap = self.settings.get("template")
-        if templates["enabled"]:
-            temp_res: Response = self._generate_template(templates["text"], writer, self._auto_azure_state["template_name"])
+            return res
+        
+        self._log_opco_report(opco_report)
+        res["opcos"] = opco_report
 
+        if dropped_rows > 0:
+            rows_str: str = "rows" if dropped_rows > 1 else "row"
+            res["message"] += f", dropped {dropped_rows}/{base_len} {rows_str} from file due to missing values"
+
+        self.logger.info(f"Generated {csv_name} at {output_dir}")
+
+        if temp_res is not None:
             res["status"] = temp_res["status"]
             res["message"] += temp_res["message"]
 
+            # the text files of the previous chunks are kept.
+            if temp_res["status"] == "error" and template_count > 0:
+                res["message"] += f" after generating {template_count} text files"
+
             # NOTE: the only error here is if the text is too long.
             if temp_res["status"] == "error":
                 self.logger.warning(f"{res['message']}, text trimmed to 1250 characters from {len(templates['text'])}")
@@ -270,6 +374,129 @@ class API:
 
         return res
     
+    def rebuild_username_index(self) -> Response:
+        '''Rebuilds the username index from the Azure CSV files in the output directory. The
+        content of the Response is the amount of usernames in the index.'''
+        output_dir: str = self.settings.get("output_dir")
+
+        try:
+            count: int = self._get_username_index().rebuild(output_dir)
+        except sqlite3.Error as e:
+            self.logger.critical(f"Failed to rebuild username index: {e}")
+
+            return utils.generate_response("error", message="Failed to rebuild the username index", content=0)
+        
+        return utils.generate_response(message=f"Indexed {count} usernames from {output_dir}", content=count)
+    
+    def _get_username_index(self) -> UsernameIndex:
+        '''Gets the username index, it is created on the first call.'''
+        if self._username_index is None:
+            self._username_index = UsernameIndex(
+                self._project_root / "config" / USERNAME_INDEX_FILE, logger=self.logger
+            )
+        
+        return self._username_index
+    
+    def close_username_index(self) -> None:
+        '''Closes the username index database, it is opened again when it is used next.'''
+        if self._username_index is not None:
+            self._username_index.close()
+            self._username_index = None
+
+    def _check_duplicate_names(self, names: list[str], *, seen_names: dict[str, int] = None) -> list[str]:
+        '''Numbers the duplicate names. If the username index is enabled, the names are returned as is
+        and the duplicates are numbered by `API._assign_usernames` together with the previous runs.'''
+        if self.settings.get("username_index"):
+            return names
+
+        return utils.check_duplicate_names(names, seen_names=seen_names)
+    
+    def _assign_usernames(self, usernames: list[str]) -> list[str]:
+        '''Replaces the usernames that exist from previous runs or repeat in the list with the next 
+        free username, if the username index is enabled.'''
+        if not self.settings.get("username_index"):
+            return usernames
+
+        try:
+            return self._get_username_index().assign(usernames)
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to check usernames with the username index: {e}")
+        
+        # the names were not deduplicated, the usernames of the list must still be unique.
+        return number_usernames(usernames, logger=self.logger)
+    
+    def _index_usernames(self, write_res: Response, usernames: list[str]) -> None:
+        '''Adds the written usernames to the username index, if the username index is enabled.'''
+        if not self.settings.get("username_index") or write_res["status"] != "success":
+            return
+
+        try:
+            self._get_username_index().add_many(usernames)
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to add usernames to the username index: {e}")
+
+    def _get_partial_message(
+        self, message: str, file_name: str, csv_name: str, written_rows: int, template_count: int
+    ) -> str:
+        '''Adds the output of the previous chunks to the error message of a failed chunk. The previous
+        chunks are kept, the file can be fixed and the remaining rows uploaded.'''
+        if written_rows == 0:
+            return message
+
+        self.logger.warning(f"Partial output of {file_name}: {written_rows} rows in {csv_name}")
+        message += f", the first {written_rows} rows were already written to {csv_name}"
+
+        if template_count > 0:
+            message += f" with {template_count} text files"
+
+        return message
+
+    def _add_opco_report(self, report: OpcoReport, resolution: OpcoResolution) -> None:
+        '''Adds the counts and unknown operating companies of the resolution to the report.'''
+        for opco, count in resolution["counts"].items():
+            report["counts"][opco] = report["counts"].get(opco, 0) + count
+        
+        for opco in resolution["unknown"]:
+            if opco not in report["unknown"]:
+                report["unknown"].append(opco)
+    
+    def _log_opco_report(self, report: OpcoReport) -> None:
+        '''Logs the operating company counts, unknown operating companies are logged as a warning.'''
+        self.logger.lazy(DEBUG, "Operating company counts: %s", report["counts"])
+
+        if len(report["unknown"]) > 0:
+            unknown_count: int = sum(report["counts"][opco] for opco in report["unknown"])
+
+            self.logger.warning(
+                f"Unknown operating companies used the default domain for {unknown_count} users: {report['unknown']}"
+            )
+
+    def _reload_readers(self) -> None:
+        '''Reloads the Readers if their files were changed outside of the program.'''
+        for reader_type, reader in self.readers.items():
+            if reader.reload_if_changed():
+                self.logger.info(f"Reloaded {reader_type} Reader from file")
+
+                if reader_type == "settings":
+                    self.username_cache.clear()
+
+    def _get_csv_name(self, upload_id: str) -> str:
+        '''Gets the CSV file name for the upload ID. A new file name is created if the upload ID
+        is different from the previous upload, otherwise the previous file name is reused.'''
+        # determines whether or not to create a new file or append to an existing file
+        if upload_id != self._auto_azure_state["upload_id"]:
+            curr_date: str = utils.get_date()
+
+            # this is always reset on every run (assuming no flatten csv).
+            self._auto_azure_state["upload_id"] = upload_id
+            self._auto_azure_state["skip_version_row"] = False
+
+            self._auto_azure_state["uid"] = utils.get_id()
+            self._auto_azure_state["csv_file_name"] = f"{curr_date}-az-bulk-{self._auto_azure_state['uid']}.csv"
+            self._auto_azure_state["template_name"] = f"{curr_date}-{self._auto_azure_state['uid']}"
+
+        return self._auto_azure_state["csv_file_name"]
+    
     def _validate_df(self, df: pd.DataFrame, headers: HeaderMap, *, two_name_column_support: bool = False):
         '''Validate the DataFrame and its headers. It will return a Response indicating an
         error/success and a message with the error if applicable.
@@ -331,7 +558,7 @@ class API:
         '''Concatenates two name Series into a full name Series. This is used for two column support.
         
         If there are empty values in either series or if a non-string is read, then the row will be empty. 
-        This is intended to be used to drop the row.
+        This is intended to be used to drop the row. The index of the Series is kept.
 
         Parameters
         ----------
@@ -341,29 +568,16 @@ class API:
             last_series: pd.Series[str]
                 The Series representing the last name column.
         '''
-        name_func = lambda x: "" if not isinstance(x, str) else x.strip()
-
-        first_series = first_series.fillna("").apply(name_func)
-        last_series = last_series.fillna("").apply(name_func)
+        first_series = Parser.strip_strings(first_series).fillna("")
+        last_series = Parser.strip_strings(last_series).fillna("")
 
-        first_list: list[str] = first_series.to_list()
-        last_list: list[str] = last_series.to_list()
+        self.logger.lazy(DEBUG, "Concatenating to full name, first name data: %s | last name data: %s", first_series, last_series)
 
-        self.logger.debug(f"Concatenating to full name, first name data: {first_list} | last name data: {last_list}")
-
-        full_names: list[str] = []
-
-        for i, f_name in enumerate(first_list):
-            l_name: str = last_list[i]
-
-            if f_name == "" or l_name == "":
-                full_names.append("")
-            else:
-                full_names.append(f_name + " " + l_name)
-        
-        full_series: pd.Series = pd.Series(full_names)
+        full_series: pd.Series = (first_series + " " + last_series).where(
+            first_series.ne("") & last_series.ne(""), ""
+        )
 
-        self.logger.debug(f"Concatenated names: {full_names}")
+        self.logger.lazy(DEBUG, "Concatenated names: %s", full_series)
 
         return full_series
     
@@ -378,26 +592,27 @@ class API:
         '''
         res: Response = utils.generate_response(message="")
 
-        self.logger.debug(f"Manual generation data: {content}")
-        names: list[str] = []
-        opcos: list[str] = []
-        full_names: list[str] = []
+        self.logger.lazy(DEBUG, "Manual generation data: %s", content)
+
+        self._reload_readers()
 
         opco_mappings: dict[str, str] = self.opco.get_content()
 
         # contains name, opco, and id. id is not relevant to this however.
         # i could also possibly add in the block sign in values in the content...
-        for obj in content:
-            name: str = utils.format_name(obj["name"])
-            full_name: str = utils.format_name(obj["name"], keep_full=True)
-            opco: str = obj["opco"].lower()
+        names, full_names = utils.format_names([obj["name"] for obj in content], cache=self.name_cache)
+        opcos: list[str] = [obj["opco"].lower() for obj in content]
+
+        self.logger.lazy(DEBUG, "Opcos: %s", opcos)
+        dupe_names: list[str] = self._check_duplicate_names(names)
 
-            names.append(name)
-            full_names.append(full_name)
-            opcos.append(opco)
+        resolution: OpcoResolution = utils.resolve_opcos(opcos, opco_mappings)
 
-        self.logger.debug(f"Opcos: {opcos}") 
-        dupe_names: list[str] = utils.check_duplicate_names(names)
+        opco_report: OpcoReport = {"counts": {}, "unknown": []}
+        self._add_opco_report(opco_report, resolution)
+        self._log_opco_report(opco_report)
+
+        res["opcos"] = opco_report
 
         formatters: Formatting = self.settings.get("format")
         usernames: list[str] = utils.generate_usernames(
@@ -407,12 +622,10 @@ class API:
             format_type=formatters["format_type"],
             format_case=formatters["format_case"],
             format_style=formatters["format_style"],
+            cache=self.username_cache,
+            resolution=resolution,
         )
-        passwords: list[str] = []
-        for _ in range(len(names)):
-            password_res: Response = self.generate_password()
-
-            passwords.append(password_res["content"])
+        usernames = self._assign_usernames(usernames)
 
         writer: AzureWriter = self._get_azure_writer(
             full_names=full_names,
@@ -424,7 +637,8 @@ class API:
         uid: str = utils.get_id()
 
         csv_name: str = f"{curr_date}-az-bulk-{uid}.csv"
-        writer.write(Path(self.get_reader_value("settings", "output_dir")) / csv_name)
+        write_res: Response = writer.write(Path(self.get_reader_value("settings", "output_dir")) / csv_name)
+        self._index_usernames(write_res, usernames)
 
         self.logger.info(f"Manual generated {csv_name} at {self.get_reader_value('settings', 'output_dir')}")
 
@@ -464,11 +678,7 @@ class API:
         '''Creates an AzureWriter with the data set for writing.'''
         writer: AzureWriter = AzureWriter(logger=self.logger, project_root=self._project_root)
 
-        passwords: list[str] = []
-        for _ in range(len(names)):
-            password_res: Response = self.generate_password()
-
-            passwords.append(password_res["content"])
+        passwords: list[str] = self.generate_passwords(len(names))["content"]
 
         writer.set_full_names(full_names)
         writer.set_names(names)
@@ -478,7 +688,32 @@ class API:
 
         return writer
 
-    def _generate_template(self, text: str, writer: AzureWriter, file_name: str) -> Response:
+    def _get_template_archive(self, file_name: str) -> TemplateArchive | None:
+        '''Gets the template archive of the file name if the archive setting is used, otherwise None is returned.'''
+        archive: str = self.settings.get_search("archive", parent_key="template")
+
+        if archive not in ("zip", "tar"):
+            return None
+
+        return TemplateArchive(AzureWriter.get_archive_path(self.settings.get("output_dir"), file_name, archive), archive)
+
+    def _commit_template_archive(self, archive: TemplateArchive | None) -> bool:
+        '''Moves the template archive into the templates folder, if it is used. It returns False if it failed.'''
+        if archive is None:
+            return True
+
+        try:
+            archive.commit()
+        except OSError as e:
+            self.logger.error(f"Failed to move template archive {archive.path}: {e}")
+            archive.close()
+
+            return False
+        
+        return True
+
+    def _generate_template(self, text: str, writer: AzureWriter, file_name: str, *, 
+            out_archive: TemplateArchive = None) -> Response:
         res: Response = utils.generate_response(message="")
         if text.strip() == "":
             res["status"] = "error"
@@ -486,10 +721,15 @@ class API:
 
             return res
 
+        archive: str = self.settings.get_search("archive", parent_key="template")
+
         template_res: Response = writer.write_template(
             self.settings.get("output_dir"), 
             text=text, 
             file_name=file_name,
+            workers=self.settings.get_search("workers", parent_key="template") or 1,
+            archive=archive if archive in ("zip", "tar") else None,
+            out_archive=out_archive,
         )
 
         if template_res["status"] == "error":
@@ -539,8 +779,10 @@ class API:
     
     def insert_update_rm_many(self, reader: ReaderType, content: dict[str, Any]) -> dict[str, Any]:
         '''Insert, update, and remove content to the Reader from a given dictionary.'''
-        self.readers[reader].clear()
-        res: dict[str, Any] = self.readers[reader].insert_update_many(content)
+        # the clear and insertions are written once.
+        with self.readers[reader].batch():
+            self.readers[reader].clear()
+            res: dict[str, Any] = self.readers[reader].insert_update_many(content)
 
         return res
     
@@ -602,6 +844,10 @@ class API:
 
         if res["status"] == "success":
             self.settings.write(self.settings.get_content())
+
+            # the usernames are keyed by the format, old entries are never used again.
+            if key == "format" or key in DEFAULT_SETTINGS_MAP["format"]:
+                self.username_cache.clear()
         
         self.logger.debug(f"Update setting response: {res}")
 
@@ -616,7 +862,26 @@ class API:
         
         The password is part of the `content` key of the Response.
         '''
-        res: Response = utils.generate_response(message="Generated password", content="")
+        res: Response = self.generate_passwords(1)
+        res["content"] = res["content"][0]
+
+        return res
+    
+    def generate_passwords(self, count: int) -> Response:
+        '''Generates random passwords based off of the settings and returns a response. The settings
+        are read once for all passwords. The passwords will always be returned regardless of an error or not.
+
+        The passwords are always guaranteed to have one lowercase letter, one uppercase letter,
+        and one special character.
+        
+        The list of passwords is part of the `content` key of the Response.
+
+        Parameters
+        ----------
+            count: int
+                The amount of passwords to generate.
+        '''
+        res: Response = utils.generate_response(message="Generated password", content=[])
 
         # if all else fails then grab the default values.
         password_settings: Password = self.settings.get("password")
@@ -636,16 +901,9 @@ class API:
 
                 # catastrophic fail, will default back to default settings but still generate a password.
                 return utils.generate_response("error", message="Unknown failure has occurred, the issue has been logged", 
-                    content=utils.generate_password(DEFAULT_SETTINGS_MAP["password"]["length"]))
+                    content=utils.generate_passwords(count, DEFAULT_SETTINGS_MAP["password"]))
         
-        password: str = utils.generate_password(
-            password_settings["length"], 
-            use_punctuations=password_settings["use_punctuations"],
-            use_uppercase_letters=password_settings["use_uppercase"],
-            use_numbers=password_settings["use_numbers"],
-        )
-
-        res["content"] = password
+        res["content"] = utils.generate_passwords(count, password_settings)
 
         return res
 
@@ -715,6 +973,16 @@ class API:
 
         return utils.generate_response(status='success', message=f"Found columns {','.join(found)}")
     
+    def get_cache_stats(self) -> Response:
+        '''Gets the hit and miss statistics of the name caches. The `content` of the Response
+        is a dictionary with the keys `names` and `usernames`.'''
+        stats: dict[str, CacheStats] = {
+            "names": self.name_cache.get_stats(),
+            "usernames": self.username_cache.get_stats(),
+        }
+
+        return utils.generate_response(message="Cache statistics", content=stats)
+
     def get_metadata(self) -> Metadata:
         '''Gets the metadata in a dictionary response.'''
         return META
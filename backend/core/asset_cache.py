@@ -0,0 +1,126 @@
+from support.types import Asset
+from pathlib import Path
+import mimetypes, hashlib, gzip, re
+
+# optional, only gzip is used if it is not installed.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# vite adds a content hash to the built file names in the assets folder, e.g. assets/index-BZ3kd9_a.js.
+# these never change, a new build creates a new file name.
+HASHED_REGEX: re.Pattern = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL: str = "public, max-age=31536000, immutable"
+# the browser must check the ETag before using its copy, e.g. for index.html.
+REVALIDATE_CACHE_CONTROL: str = "no-cache"
+
+# files below this size are not compressed, the headers outweigh the savings.
+MIN_COMPRESS_SIZE: int = 256
+
+# the system mime types can be wrong (e.g. the Windows registry), module scripts require the correct type.
+CONTENT_TYPES: dict[str, str] = {
+    ".js": "text/javascript",
+    ".mjs": "text/javascript",
+    ".css": "text/css",
+    ".html": "text/html",
+    ".json": "application/json",
+    ".svg": "image/svg+xml",
+    ".wasm": "application/wasm",
+}
+COMPRESSIBLE_TYPES: set[str] = {"application/json", "image/svg+xml", "application/wasm", "application/xml"}
+
+class AssetCache:
+    def __init__(self, directory: Path | str):
+        '''In memory cache of the files of a directory, used to serve the built SPA. The files are read
+        once and text files are precompressed with gzip, and with brotli if it is installed.
+
+        Files that are changed or added after the cache is created are not seen by the cache.
+
+        Parameters
+        ----------
+            directory: Path | str
+                The directory of the files. An `index.html` of a folder is also served with the folder path.
+        '''
+        self.directory: Path = Path(directory)
+        self._assets: dict[str, Asset] = {}
+
+        for file in self.directory.rglob("*"):
+            if not file.is_file():
+                continue
+
+            rel_path: str = file.relative_to(self.directory).as_posix()
+            asset: Asset = self._load(file, immutable=HASHED_REGEX.match(rel_path) is not None)
+            url_path: str = "/" + rel_path
+
+            self._assets[url_path] = asset
+
+            if file.name == "index.html":
+                self._assets[url_path[:-len("index.html")]] = asset
+
+    def get(self, url_path: str) -> Asset | None:
+        '''Gets the asset of the URL path, None is returned if it is not cached.'''
+        return self._assets.get(url_path)
+
+    def __len__(self) -> int:
+        return len(self._assets)
+
+    @staticmethod
+    def choose_encoding(asset: Asset, accept_encoding: str | None) -> str:
+        '''Chooses the encoding of the asset from the `Accept-Encoding` header. Brotli is preferred
+        over gzip, and encodings with a q value of 0 are not used.'''
+        accepted: dict[str, float] = {}
+
+        for part in (accept_encoding or "").split(","):
+            coding, _, params = part.strip().partition(";")
+            quality: float = 1
+
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0
+
+            if coding != "":
+                accepted[coding.lower()] = quality
+
+        for encoding in ["br", "gzip"]:
+            if encoding in asset["encodings"] and accepted.get(encoding, accepted.get("*", 0)) > 0:
+                return encoding
+
+        return "identity"
+
+    @staticmethod
+    def get_etag(asset: Asset, encoding: str) -> str:
+        '''Gets the strong ETag of an encoding of the asset, each encoding has its own ETag.'''
+        if encoding == "identity":
+            return f'"{asset["etag"]}"'
+
+        return f'"{asset["etag"]}-{encoding}"'
+
+    def _load(self, file: Path, *, immutable: bool = False) -> Asset:
+        content: bytes = file.read_bytes()
+        content_type: str = CONTENT_TYPES.get(file.suffix.lower()) \
+            or mimetypes.guess_type(file.name)[0] or "application/octet-stream"
+
+        asset: Asset = {
+            "content_type": content_type,
+            "cache_control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+            "etag": hashlib.sha256(content).hexdigest()[:32],
+            "encodings": {"identity": content},
+        }
+
+        if len(content) >= MIN_COMPRESS_SIZE and \
+            (content_type.startswith("text/") or content_type in COMPRESSIBLE_TYPES):
+            compressed: dict[str, bytes] = {"gzip": gzip.compress(content, compresslevel=6, mtime=0)}
+
+            if brotli is not None:
+                compressed["br"] = brotli.compress(content)
+
+            for encoding, data in compressed.items():
+                # only kept if it is actually smaller.
+                if len(data) < len(content):
+                    asset["encodings"][encoding] = data
+
+        return asset
@@ -1,14 +1,20 @@
-from typing import Literal
+from typing import Literal, Iterable, Iterator, TextIO
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 from support.vars import AZURE_HEADERS, AZURE_VERSION
 from logger import Log
+from logging import DEBUG
 from support.types import Response
+from core.template import Template
 from pathlib import Path
+from io import BytesIO
 import tempfile as tf
+import zipfile, tarfile, csv
+import shutil, time
 import os
-import pandas as pd
 import support.utils as utils
 
 HeadersKey = Literal["name", "username", "password", "first_name", "last_name", "block_sign_in"]
+ArchiveType = Literal["zip", "tar"]
 
 class AzureWriter:
     def __init__(self, *, logger: Log = None, project_root: Path = None): 
@@ -35,7 +41,7 @@ class AzureWriter:
     def set_full_names(self, names: list[str]):
         '''Sets the full names for the data.'''
         self.logger.info(f"Setting full names")
-        self.logger.debug(f"Full names data: {names}")
+        self.logger.lazy(DEBUG, "Full names data: %s", names)
         self._headers_data[AZURE_HEADERS["name"]] = names
     
     def set_usernames(self, usernames: list[str]):
@@ -47,7 +53,7 @@ class AzureWriter:
                 List of names of usernames.
         '''
         self.logger.info(f"Setting usernames")
-        self.logger.debug(f"Username data: {usernames}")
+        self.logger.lazy(DEBUG, "Username data: %s", usernames)
         self._headers_data[AZURE_HEADERS["username"]] = usernames
     
     def set_passwords(self, passwords: list[str]) -> None:
@@ -71,8 +77,7 @@ class AzureWriter:
         '''
         # i am not actually sure how to let the user define these in the frontend.
         if len(blockages) < capacity:
-            for _ in range(capacity - len(blockages)):
-                blockages.append("No")
+            blockages = blockages + ["No"] * (capacity - len(blockages))
             
         self.logger.info(f"Setting block sign in")
         self._headers_data[AZURE_HEADERS["block_sign_in"]] = blockages
@@ -86,19 +91,21 @@ class AzureWriter:
         for name in names:
             name_list: list[str] = name.split()
 
-            first_name: str = " ".join(name_list[0:-1])
-            last_name: str = name_list[-1]
-
-            first_names.append(first_name)
-            last_names.append(last_name)
+            first_names.append(" ".join(name_list[0:-1]))
+            last_names.append(name_list[-1])
         
         self.logger.info(f"Setting first and last names")
-        self.logger.debug(f"Names data: {names}")
+        self.logger.lazy(DEBUG, "Names data: %s", names)
         self._headers_data[AZURE_HEADERS["first_name"]] = first_names
         self._headers_data[AZURE_HEADERS["last_name"]] = last_names
     
     def write(self, out: Path | str, *, skip_version: bool = False) -> Response:
         '''Write to a CSV file. It will always append to the file.
+
+        A new file is written to a temporary file and moved to the output path. If the file
+        already exists, only the new rows are appended to it. The appended rows are guarded by a journal
+        holding the previous size of the file, if the append fails then the file is truncated back
+        to that size on the next write.
         
         Parameter
         ---------
@@ -107,7 +114,7 @@ class AzureWriter:
                 if the directories does not exist.
             
             skip_version: bool = False
-                If true, skip adding the version on the first row.
+                If true, skip adding the version on the first row. This is ignored if the file exists.
         '''
         res: Response = utils.generate_response(message="Successfully generated CSV file")
         path: Path = out if isinstance(out, Path) else Path(out)
@@ -115,31 +122,27 @@ class AzureWriter:
         self.logger.debug(f"Given CSV output path: {path} | Skip Version: {skip_version}")
 
         if not path.parent.exists():
-            path.mkdir(parents=True, exist_ok=True)
+            path.parent.mkdir(parents=True, exist_ok=True)
 
-        # azure version must be specified on the first row.
         try:
-            with tf.NamedTemporaryFile("a", delete=False, dir=self._project_root) as file:
-                self.logger.info(f"Creating temporary file {file.name}")
-                temp_path: Path = Path(file.name)
-                keep_headers: bool = True
+            self._recover_journal(path)
 
-                if not skip_version: 
-                    file.write(AZURE_VERSION+"\n")
-                    file.flush()
+            if path.exists():
+                self._append(path)
+            else:
+                # azure version must be specified on the first row.
+                with tf.NamedTemporaryFile("a", delete=False, dir=self._project_root) as file:
+                    self.logger.info(f"Creating temporary file {file.name}")
+                    temp_path: Path = Path(file.name)
 
-                if path.exists():
-                    with open(path, "r") as f:
-                        csv_content: str = f.read()
+                    if not skip_version: 
+                        file.write(AZURE_VERSION+"\n")
+                        file.flush()
 
-                    keep_headers = False 
-                    file.write(csv_content)
-                    file.flush()
+                with open(temp_path, "a", newline="") as file:
+                    self._write_rows(file, header=True)
 
-                df: pd.DataFrame = pd.DataFrame(self._headers_data)
-                df.to_csv(temp_path, mode="a", index=False, header=keep_headers)
-
-            os.replace(temp_path, path)
+                os.replace(temp_path, path)
         except Exception as e:
             self.logger.critical(f"Failed to write CSV file: {e}")
 
@@ -148,9 +151,86 @@ class AzureWriter:
     
         return res
     
-    def write_template(self, out: Path | str, *, text: str, file_name: str = None) -> Response:
+    def _append(self, path: Path) -> None:
+        '''Appends the rows to an existing CSV file without the headers. The size of the file
+        is written to the journal before appending, and the journal is removed once the rows are
+        written to the disk.'''
+        journal: Path = self._get_journal_path(path)
+
+        # the journal is moved in place to never leave a partially written size.
+        with tf.NamedTemporaryFile("w", delete=False, dir=self._project_root) as file:
+            temp_journal: str = file.name
+
+            file.write(str(path.stat().st_size))
+            file.flush()
+            os.fsync(file.fileno())
+        
+        os.replace(temp_journal, journal)
+
+        self.logger.info(f"Appending to existing CSV {path.name}")
+
+        # newline is handled by the csv writer, the same as a new file.
+        with open(path, "a", newline="") as file:
+            self._write_rows(file, header=False)
+
+            file.flush()
+            os.fsync(file.fileno())
+
+        journal.unlink()
+    
+    def _write_rows(self, file: TextIO, *, header: bool) -> None:
+        '''Writes the rows of the data directly from the columns to the file. The rows are
+        written in the same format as pandas, without copying the data into a DataFrame.'''
+        columns: list[list[str]] = list(self._headers_data.values())
+        row_count: int = len(columns[0])
+
+        if any(len(column) != row_count for column in columns):
+            lengths: dict[str, int] = {key: len(column) for key, column in self._headers_data.items()}
+            raise ValueError(f"All columns must be of the same length, got {lengths}")
+
+        csv_writer = csv.writer(file, lineterminator=os.linesep)
+
+        if header:
+            csv_writer.writerow(self._headers_data.keys())
+
+        csv_writer.writerows(zip(*columns))
+    
+    def _recover_journal(self, path: Path) -> None:
+        '''Truncates the CSV file to the size recorded in its journal, if the journal exists.
+        A journal only exists if a previous append did not finish.'''
+        journal: Path = self._get_journal_path(path)
+
+        if not journal.exists():
+            return
+        
+        with open(journal, "r") as file:
+            content: str = file.read().strip()
+        
+        if content.isdigit() and path.exists():
+            size: int = int(content)
+            self.logger.warning(f"Found incomplete append to {path.name}, truncating to {size} bytes")
+
+            os.truncate(path, size)
+        
+        journal.unlink()
+    
+    def _get_journal_path(self, path: Path) -> Path:
+        '''Returns the Path of the journal for a CSV file.'''
+        return path.with_name(path.name + ".journal")
+    
+    def write_template(
+        self, 
+        out: Path | str, 
+        *, 
+        text: str, 
+        file_name: str = None, 
+        workers: int = 1,
+        archive: ArchiveType = None,
+        out_archive: "TemplateArchive" = None,
+    ) -> Response:
         '''Writes the template text for each user. A Response is returned with the standard keys and
-        `output_dir`, being the folder of the created files.
+        `output_dir`, being the folder of the created files. If an archive is used then
+        `output_file` is included, being the path of the archive.
         
         A templates folder is created if it does not exist, and sub-folders holding the text files
         are created in the templates folder.
@@ -170,6 +250,21 @@ class AzureWriter:
             file_name: str
                 The name of the templates folder. This is automatically generated if None, or if
                 flatten CSV is used then the same file name should be used.
+            
+            workers: int, default 1
+                The amount of threads used to write the files. Each file is still written to a
+                temporary file and moved into the folder. By default it is 1, writing the files serially.
+
+            archive: ArchiveType, default None
+                Writes all files into a single `zip` or `tar` archive in the templates folder instead of a
+                sub-folder. If the archive exists then the files are added to it. The archive is written to a
+                temporary file and moved into the templates folder once completed. By default it is None,
+                writing each file separately.
+
+            out_archive: TemplateArchive, default None
+                The archive the files are added to instead of a new archive, it is used to add the chunks of
+                an upload to one archive. The archive is not moved into the templates folder, the caller must
+                commit it. By default it is None, using `archive`.
         '''
         # allows us to write to the same output folder.
         if file_name is None:
@@ -188,49 +283,146 @@ class AzureWriter:
 
         res: Response = self._validates_template_write(names, usernames, passwords)
 
+        if out_archive is not None:
+            archive = out_archive.archive
+
         # used for testing, can be safely ignored anywhere else
-        res["output_dir"] = str(path)
+        res["output_dir"] = str(path if archive is None else path.parent)
+
+        if archive is not None:
+            res["output_file"] = str(out_archive.path if out_archive is not None else self.get_archive_path(out, file_name, archive))
 
         if res["status"] == "error":
             return res
         
-        text_count: int = 0
+        template: Template = Template(text)
+
+        # the text is validated once for all users.
+        if not template.is_valid():
+            self.logger.error(f"Failed to generate text files, text length {len(template.text)} is over {Template.MAX_CHARS}")
+
+            res["status"] = "error"
+            res["message"] = f"Cannot have a text of over {Template.MAX_CHARS} characters."
+
+            return res
+        
         failed_count: int = 0
 
-        if not path.exists():
+        if archive is None and not path.exists():
             path.mkdir(parents=True, exist_ok=True)
 
-        for i, name in enumerate(names): 
-            username: str = usernames[i]
-            password: str = passwords[i]
-            uid: str = utils.get_id()
+        def render_files() -> Iterator[tuple[Path, str]]:
+            texts: Iterator[str] = template.render_many(zip(usernames, passwords, names))
+
+            for name, content in zip(names, texts):
+                yield path / f"{name}-{utils.get_id()}.txt", content
+
+        if archive is None:
+            text_count, write_fails = self._write_files(render_files(), workers)
+        else:
+            try:
+                if out_archive is not None:
+                    text_count, write_fails = self._write_archive(out_archive, render_files())
+                else:
+                    with TemplateArchive(Path(res["output_file"]), archive) as new_archive:
+                        text_count, write_fails = self._write_archive(new_archive, render_files())
+                        new_archive.commit()
+            except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+                self.logger.error(f"Failed to write template archive {res['output_file']}: {e}")
 
-            file_name: str = f"{name}-{uid}.txt"
+                res["status"] = "error"
+                res["message"] = "Failed to write template archive"
 
-            # NOTE: calculated values are with a Response return will always be in the key "content".
-            text_res: Response = utils.generate_text(text=text, username=username, name=name, password=password)
-            
-            if text_res["status"] == "success":
-                text_count += 1
-            elif text_res["status"] == "error":
-                failed_count += 1
-                self.logger.error(f"Failed to generate text file for user {name}: {text_res}")
-                self.logger.error(f"Failed count: {failed_count}")
+                return res
 
-                res["status"] = "error"
-                res["message"] = text_res["message"] + f" Fails count: {failed_count}"
-                continue
-            
-            with tf.NamedTemporaryFile("w", delete=False, dir=self._project_root) as file:
-                temp_file: Path = Path(file.name)
-                file.write(text_res["content"])
+        if write_fails > 0:
+            failed_count += write_fails
 
-            os.replace(temp_file, path / file_name)
+            res["status"] = "error"
+            res["message"] = f"Failed to write {write_fails} text files. Fails count: {failed_count}"
 
         self.logger.info(f"Successful template writes: {text_count} | Failed template writes: {failed_count}")
 
         return res
     
+    def _write_files(self, files: Iterable[tuple[Path, str]], workers: int) -> tuple[int, int]:
+        '''Writes the contents to the file paths, using a thread pool if there is more than one worker.
+        The amount of pending files is bounded to keep the contents out of memory until they are written.
+
+        It returns a tuple of the successful and failed writes.
+        '''
+        written: int = 0
+        failed: int = 0
+
+        if workers <= 1:
+            for file_path, content in files:
+                try:
+                    self._write_file(file_path, content)
+                    written += 1
+                except Exception as e:
+                    self.logger.error(f"Failed to write {file_path.name}: {e}")
+                    failed += 1
+            
+            return written, failed
+
+        def count(futures: Iterable[Future]) -> None:
+            nonlocal written, failed
+
+            for future in futures:
+                if future.exception() is None:
+                    written += 1
+                else:
+                    self.logger.error(f"Failed to write text file: {future.exception()}")
+                    failed += 1
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending: set[Future] = set()
+
+            for file_path, content in files:
+                if len(pending) >= workers * 4:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    count(done)
+
+                pending.add(executor.submit(self._write_file, file_path, content))
+            
+            count(wait(pending).done)
+        
+        return written, failed
+    
+    def _write_archive(self, out_archive: "TemplateArchive", files: Iterable[tuple[Path, str]]) -> tuple[int, int]:
+        '''Adds the contents to the archive, only the file name of the paths are used in the archive.
+
+        It returns a tuple of the successful and failed writes.
+        '''
+        written: int = 0
+        failed: int = 0
+
+        # an archive that cannot be opened fails the entire write.
+        out_archive.open()
+
+        for file_path, content in files:
+            try:
+                out_archive.add(file_path.name, content)
+                written += 1
+            except Exception as e:
+                self.logger.error(f"Failed to add {file_path.name} to archive: {e}")
+                failed += 1
+        
+        return written, failed
+
+    @staticmethod
+    def get_archive_path(out: Path | str, file_name: str, archive: ArchiveType) -> Path:
+        '''Returns the Path of the template archive in the templates folder of the output path.'''
+        return Path(out) / "templates" / f"templates-{file_name}.{archive}"
+
+    def _write_file(self, path: Path, content: str) -> None:
+        '''Writes the content to a temporary file and moves it to the path.'''
+        with tf.NamedTemporaryFile("w", delete=False, dir=self._project_root) as file:
+            temp_file: Path = Path(file.name)
+            file.write(content)
+
+        os.replace(temp_file, path)
+    
     def get_data(self, key: HeadersKey) -> list[str]:
         '''Gets the specified data.'''
         return self._headers_data[key]
@@ -276,4 +468,93 @@ class AzureWriter:
             elif len(item) > base_len:
                 error_res["message"] = f"Key {key} has more items than expected"
 
-        return success_res
\ No newline at end of file
+        return success_res
+class TemplateArchive:
+    def __init__(self, path: Path, archive: ArchiveType):
+        '''Archive of the text files, used to add the files of several template writes to an archive at once.
+        The files are added to a temporary copy of the archive, which replaces the archive once `commit()`
+        is called. If it is closed without a commit then the archive is not changed.
+
+        Parameters
+        ----------
+            path: Path
+                The path of the archive. If it exists then the files are added to a copy of it.
+
+            archive: ArchiveType
+                The type of the archive.
+        '''
+        self.path: Path = path
+        self.archive: ArchiveType = archive
+
+        self._temp_path: Path = None
+        self._file: zipfile.ZipFile | tarfile.TarFile = None
+    
+    def __enter__(self) -> "TemplateArchive":
+        return self
+    
+    def __exit__(self, *args) -> None:
+        self.close()
+    
+    def add(self, name: str, content: str) -> None:
+        '''Adds the content to the archive as a file, the temporary archive is created if it is not open.'''
+        self.open()
+
+        if isinstance(self._file, zipfile.ZipFile):
+            self._file.writestr(name, content)
+
+            return
+        
+        data: bytes = content.encode()
+
+        info: tarfile.TarInfo = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+
+        self._file.addfile(info, BytesIO(data))
+    
+    def commit(self) -> None:
+        '''Closes the temporary archive and moves it to the path. Nothing is done if no files were added.'''
+        if self._file is None:
+            return
+
+        self._file.close()
+        self._file = None
+
+        os.replace(self._temp_path, self.path)
+        self._temp_path = None
+    
+    def close(self) -> None:
+        '''Removes the temporary archive if it was not committed.'''
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        
+        if self._temp_path is not None:
+            self._temp_path.unlink(missing_ok=True)
+            self._temp_path = None
+    
+    def open(self) -> None:
+        '''Creates the temporary archive, nothing is done if it is already open.'''
+        if self._file is not None:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # the temp file is in the same folder to keep the move into the templates folder atomic.
+        with tf.NamedTemporaryFile(delete=False, dir=self.path.parent, prefix=".", suffix=f".{self.archive}") as file:
+            self._temp_path = Path(file.name)
+
+        try:
+            # the archive is copied once for every upload, the chunks of the upload are added to the copy.
+            mode: Literal["w", "a"] = "w"
+            if self.path.exists():
+                shutil.copyfile(self.path, self._temp_path)
+                mode = "a"
+
+            if self.archive == "zip":
+                self._file = zipfile.ZipFile(self._temp_path, mode, compression=zipfile.ZIP_DEFLATED)
+            else:
+                self._file = tarfile.open(self._temp_path, mode)
+        except Exception:
+            self.close()
+            raise
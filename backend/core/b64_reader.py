@@ -0,0 +1,49 @@
+from base64 import b64decode
+import io
+
+class B64Reader(io.RawIOBase):
+    def __init__(self, data: str, start: int = 0, *, block_size: int = 1 << 16):
+        '''Read-only binary stream that decodes a base64 string lazily.
+
+        Only one block of the string is decoded at a time, the decoded bytes of the
+        entire string are never held in memory. This allows pandas to read the data in chunks.
+
+        Parameters
+        ----------
+            data: str
+                The base64 string. It must be valid base64 from the start position onwards,
+                data URL prefixes must be excluded through `start`.
+
+            start: int, default 0
+                The index of the string where the base64 data begins.
+
+            block_size: int, default 65536
+                The amount of base64 characters decoded per read. It is rounded down to a multiple of 4.
+        '''
+        super().__init__()
+
+        self._data: str = data
+        self._pos: int = start
+        self._block_size: int = max(4, block_size - block_size % 4)
+        self._buffer: bytes = b""
+        self._offset: int = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: bytearray | memoryview) -> int:
+        size: int = len(b)
+
+        while len(self._buffer) - self._offset < size and self._pos < len(self._data):
+            # base64 decodes in groups of 4 characters, the block size is always aligned to it.
+            end: int = min(self._pos + max(self._block_size, (size // 3 + 1) * 4), len(self._data))
+
+            self._buffer = self._buffer[self._offset:] + b64decode(self._data[self._pos:end])
+            self._offset = 0
+            self._pos = end
+
+        read_len: int = min(size, len(self._buffer) - self._offset)
+        b[:read_len] = self._buffer[self._offset:self._offset + read_len]
+        self._offset += read_len
+
+        return read_len
@@ -0,0 +1,65 @@
+from core.b64_reader import B64Reader
+from support.vars import CSV_CHUNK_SIZE
+from io import BufferedReader, TextIOWrapper
+from typing import Iterable
+import pandas as pd
+import csv
+
+def get_csv_columns(b64: str, start: int, columns: Iterable[str]) -> list[str]:
+    '''Reads only the header of a base64 CSV and gets the header names that match the given columns.
+    The names are returned as they are in the file, in the order of the file.
+
+    Parameters
+    ----------
+        b64: str
+            The base64 string of the CSV.
+
+        start: int
+            The index of the string where the base64 data begins.
+
+        columns: Iterable[str]
+            The column names to find, they are not case sensitive.
+    '''
+    wanted: set[str] = {col.lower() for col in columns}
+
+    # utf-8-sig removes the BOM from the first header, pandas does the same.
+    with TextIOWrapper(BufferedReader(B64Reader(b64, start)), encoding="utf-8-sig", newline="") as file:
+        header: list[str] = next(csv.reader(file), [])
+
+    found: list[str] = []
+    for col in header:
+        # duplicate headers are renamed by pandas, only the first one is read.
+        if col.lower() in wanted and col not in found:
+            found.append(col)
+
+    return found
+
+def read_csv(b64: str, start: int, columns: Iterable[str], *, chunk_size: int = None) -> Iterable[pd.DataFrame]:
+    '''Reads a base64 CSV into DataFrames. Only the given columns are parsed and every value
+    is read as a string, empty cells are NaN.
+
+    Columns that are not found in the file are ignored, the DataFrames must be validated afterwards.
+    The data is decoded and read lazily in chunks.
+
+    Parameters
+    ----------
+        b64: str
+            The base64 string of the CSV.
+
+        start: int
+            The index of the string where the base64 data begins.
+
+        columns: Iterable[str]
+            The column names to read, they are not case sensitive.
+
+        chunk_size: int, default None
+            The amount of rows read at a time. By default it is None, using `CSV_CHUNK_SIZE`.
+    '''
+    usecols: list[str] = get_csv_columns(b64, start, columns)
+
+    return pd.read_csv(
+        BufferedReader(B64Reader(b64, start)),
+        usecols=usecols,
+        dtype=str,
+        chunksize=chunk_size or CSV_CHUNK_SIZE
+    )
@@ -0,0 +1,42 @@
+from typing import Any, Iterable, IO
+import pandas as pd
+
+# calamine is in the requirements, openpyxl is used if it is not installed.
+# calamine parses the workbook in Rust and is several times faster than openpyxl.
+try:
+    import python_calamine
+    EXCEL_ENGINE: str = "calamine"
+except ImportError:
+    python_calamine = None
+    EXCEL_ENGINE: str = "openpyxl"
+
+def read_excel(file: IO[bytes], columns: Iterable[str], *, engine: str = None) -> pd.DataFrame:
+    '''Reads the first sheet of an Excel file into a DataFrame. With calamine, only the given columns are read.
+    With openpyxl the whole sheet is read, openpyxl loads every cell regardless of `usecols`.
+
+    The cell types are inferred the same with both engines, e.g. a number in a name column stays a number
+    and is dropped by `Parser.clean`. The DataFrame must be validated afterwards, columns that are not found
+    in the file are ignored.
+
+    Parameters
+    ----------
+        file: IO[bytes]
+            The binary stream of the Excel file.
+
+        columns: Iterable[str]
+            The column names to read, they are not case sensitive.
+
+        engine: str, default None
+            The engine used by pandas to parse the file. By default it is None, using `EXCEL_ENGINE`.
+    '''
+    engine = engine or EXCEL_ENGINE
+
+    if engine == "openpyxl":
+        return pd.read_excel(file, engine=engine)
+
+    wanted: set[str] = {col.lower() for col in columns}
+
+    def use_column(col: Any) -> bool:
+        return str(col).lower() in wanted
+
+    return pd.read_excel(file, engine=engine, usecols=use_column)
@@ -1,8 +1,11 @@
 from logger import Log
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Literal, Iterator
 from support import utils
-import json, os
+from core.serializer import JSONSerializer, get_serializer
+from contextlib import contextmanager
+from copy import deepcopy
+import json, os, threading, time, atexit
 import tempfile as tf
 
 class Reader:
@@ -11,7 +14,9 @@ class Reader:
         logger: Log = None,
         update_only: bool = False,
         is_test: bool = False,
-        project_root: Path = None):
+        project_root: Path = None,
+        write_delay: float = 0,
+        serializer: JSONSerializer = None):
         '''Used to support CRUD operations on JSON data for the program.
         
         Parameters
@@ -37,6 +42,17 @@ class Reader:
                 The path to the project root. This is where the temporary files are written to
                 before being moved into the given path. By default it is None, using the
                 temporary FS as the location.
+            
+            write_delay: float, default 0
+                The seconds that writes are delayed by. If greater than 0, the data is serialized on write
+                and a background thread writes the latest data once the delay passes, coalescing
+                all writes made within the delay into one. Reader.flush() or Reader.close() must be called
+                to guarantee the final write, close() is also registered with `atexit`. By default it is 0,
+                writing immediately.
+            
+            serializer: JSONSerializer, default None
+                The serializer used to read and write the file. By default it is None, using `orjson`
+                if it is installed and the standard library otherwise.
         '''
         self.logger: Log = logger or Log()
 
@@ -48,13 +64,82 @@ class Reader:
         self._name: str = Path(self.path).name
 
         self._project_root: Path = project_root
+        self._serializer: JSONSerializer = serializer or get_serializer()
 
         self.update_only: bool = update_only
         self._is_test: bool = is_test
 
+        # used for batching writes, see Reader.batch()
+        self._batch_depth: int = 0
+        self._batch_data: dict[str, Any] = None
+
+        # used for delayed writes, see Reader.write()
+        self._write_delay: float = write_delay
+        self._pending_write: bytes = None
+        self._write_deadline: float = 0
+        self._write_cond: threading.Condition = threading.Condition()
+        # held while the file is written, acquired under the condition to keep the write order.
+        self._file_lock: threading.Lock = threading.Lock()
+        self._flusher: threading.Thread = None
+        self._closed: bool = False
+
+        if self._write_delay > 0:
+            atexit.register(self.close)
+
+        # the stat of the file from the last read or write, used to detect external changes.
+        self._file_stat: tuple[int, int, int] = None
+
         self._mkfiles()
 
-        self._content: dict[str, Any] = self.read()
+        self._defaults = defaults
+        # used for validating unupdatable defaults
+        self._update_reader_flag: bool = False
+
+        # maps every key to the paths of its parent dictionaries, see Reader._get_parent()
+        self._index: dict[str, list[tuple[tuple[str, ...], dict[str, Any]]]] = {}
+
+        self._file_stat = self._get_file_stat()
+        self._load(self.read())
+    
+    def reload_if_changed(self) -> bool:
+        '''Reloads the content if the file was changed outside of the Reader. The file is only
+        read if its modified time, size, or inode changed since the last read or write.
+
+        The content is not reloaded if the Reader has writes that are not written yet, or if the
+        file is not valid JSON. It returns True if the content was reloaded.
+        '''
+        with self._write_cond:
+            if self._batch_depth > 0 or self._pending_write is not None:
+                return False
+
+            with self._file_lock:
+                file_stat: tuple[int, int, int] = self._get_file_stat()
+
+                if file_stat is None or file_stat == self._file_stat:
+                    return False
+                
+                try:
+                    with open(self.path, "rb") as file:
+                        content: dict[str, Any] = self._serializer.loads(file.read())
+                except (OSError, json.decoder.JSONDecodeError) as e:
+                    self.logger.warning(f"File {self._name} changed but failed to read, keeping current content: {e}")
+                    return False
+
+                if not isinstance(content, dict):
+                    self.logger.warning(f"File {self._name} changed but it is not an object, keeping current content")
+                    return False
+                
+                self._file_stat = file_stat
+
+        self.logger.info(f"File {self._name} was changed externally, reloading")
+        self._load(content)
+
+        return True
+    
+    def _load(self, content: dict[str, Any]) -> None:
+        '''Sets the content of the Reader, lowercasing and validating the keys with the defaults.
+        The file is written if any corrections are made.'''
+        self._content: dict[str, Any] = content
 
         # ensures all keys are lowercase.
         lowered_content: dict[str, Any] = self._lower_keys()
@@ -62,11 +147,9 @@ class Reader:
             self._content = lowered_content
             self.write(self._content)
 
-        self._defaults = defaults
-        # used for validating unupdatable defaults
-        self._update_reader_flag: bool = False
-        if defaults:
-            self._validate_defaults(defaults)
+        self._update_reader_flag = False
+        if self._defaults:
+            self._validate_defaults(self._defaults)
 
             if self.update_only:
                 temp_dict: dict[str, Any] = self._validate_unupdatable_defaults(self._content, self._defaults)
@@ -74,6 +157,17 @@ class Reader:
                 if self._update_reader_flag:
                     self._content = temp_dict
                     self.write(self._content)
+        
+        self._build_index()
+    
+    def _get_file_stat(self) -> tuple[int, int, int] | None:
+        '''Gets the modified time, size, and inode of the file. None is returned if the file cannot be accessed.'''
+        try:
+            stat: os.stat_result = os.stat(self.path)
+        except OSError:
+            return None
+        
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
     
     def get_content(self) -> dict[str, Any]:
         '''Returns the dictionary contents.'''
@@ -87,8 +181,8 @@ class Reader:
         '''Returns the contents of the .json file in a dictionary format.'''
         content: dict[str, Any] = {}
         try:
-            with open(self.path, "r") as file:
-                content = json.load(file)
+            with open(self.path, "rb") as file:
+                content = self._serializer.loads(file.read())
         except json.decoder.JSONDecodeError:
             self.logger.error(f"JSON file was empty, failed to read")
 
@@ -97,16 +191,153 @@ class Reader:
         return content
 
     def write(self, data: dict[str, Any]) -> None:
-        '''Writes data to the file.'''
+        '''Writes data to the file. If a batch is active, then the data is written
+        once the batch exits instead.'''
+        if self._batch_depth > 0:
+            self._batch_data = data
+            return
+        
+        # serialized now, the data can be modified before the flush.
+        payload: bytes = self._serializer.dumps(data)
+
+        if self._write_delay <= 0 or self._closed:
+            with self._file_lock:
+                self._write_file(payload)
+
+            return
+        
+        with self._write_cond:
+            if self._pending_write is None:
+                self._write_deadline = time.monotonic() + self._write_delay
+
+            self._pending_write = payload
+
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+
+            self._write_cond.notify()
+    
+    def flush(self) -> None:
+        '''Writes any delayed data immediately. This does nothing if there are no pending writes.'''
+        with self._write_cond:
+            payload: bytes = self._pending_write
+            self._pending_write = None
+
+            if payload is None:
+                return
+
+            self._file_lock.acquire()
+        
+        try:
+            self._write_file(payload)
+        finally:
+            self._file_lock.release()
+    
+    def close(self) -> None:
+        '''Flushes any delayed data and stops the background writer. Writes after closing
+        are written immediately.'''
+        with self._write_cond:
+            if self._closed:
+                return
+
+            self._closed = True
+            self._write_cond.notify()
+        
+        if self._flusher is not None:
+            self._flusher.join()
+        
+        self.flush()
+    
+    def _flush_loop(self) -> None:
+        '''Background loop that writes the pending data once its delay passes.'''
+        while True:
+            with self._write_cond:
+                while not self._closed:
+                    if self._pending_write is None:
+                        self._write_cond.wait()
+                        continue
+
+                    remaining: float = self._write_deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+
+                    self._write_cond.wait(remaining)
+                
+                # close() writes the remaining data.
+                if self._closed:
+                    return
+                
+                payload: bytes = self._pending_write
+                self._pending_write = None
+
+                self._file_lock.acquire()
+            
+            try:
+                self._write_file(payload)
+            except Exception as e:
+                self.logger.critical(f"Failed to write delayed data to {self._name}: {e}")
+            finally:
+                self._file_lock.release()
+    
+    def _write_file(self, payload: bytes) -> None:
+        '''Writes the serialized data to a temporary file and moves it to the path.'''
         # only write, append does not work.
-        with tf.NamedTemporaryFile("w", delete=False, dir=self._project_root) as file:
+        with tf.NamedTemporaryFile("wb", delete=False, dir=self._project_root) as file:
             temp_file: str = file.name
 
-            json.dump(data, file)
+            file.write(payload)
+
+            file.flush()
+            os.fsync(file.fileno())
 
         os.replace(temp_file, self.path)
+        # our own writes are not external changes.
+        self._file_stat = self._get_file_stat()
+
         self.logger.info(f"File {self._name} written")
     
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        '''Context manager that holds all writes of the Reader until it exits, writing the
+        file only once. Batches can be nested, only the outermost batch writes the file.
+
+        If an exception is raised in the outermost batch, the content is restored to
+        its state before the batch and nothing is written.
+
+        Example:
+        ```python
+        with reader.batch():
+            reader.clear()
+            reader.insert_many(data)
+        ```
+        '''
+        self._batch_depth += 1
+
+        snapshot: dict[str, Any] = None
+        if self._batch_depth == 1:
+            snapshot = deepcopy(self._content)
+
+        try:
+            yield
+        except BaseException:
+            if self._batch_depth == 1:
+                self.logger.warning(f"Batch failed for {self._name}, restoring content")
+
+                self._content = snapshot
+                self._build_index()
+                self._batch_data = None
+
+            raise
+        finally:
+            self._batch_depth -= 1
+
+            if self._batch_depth == 0 and self._batch_data is not None:
+                data: dict[str, Any] = self._batch_data
+                self._batch_data = None
+
+                self.write(data)
+    
     def insert(self, key: str, value: Any) -> dict[str, Any]:
         '''Inserts a single key-value pair into the structure.
 
@@ -120,7 +351,7 @@ class Reader:
             self.logger.warning(f"Insertion failed: key {key} already exists")
             return utils.generate_response(status="error", message="Failed to insert, key already exists")
 
-        self._content[key] = value
+        self._set_key(key, value)
         self.write(self._content) 
 
         self.logger.info(f"Inserted key {key} with value: {value}")
@@ -139,7 +370,7 @@ class Reader:
                 self.logger.warning(f"Insertion failed: key {key} already exists")
                 continue
 
-            self._content[key] = value
+            self._set_key(key, value)
             self.logger.info(f"Inserted key {key} with value: {value}")
             success_ops += 1
 
@@ -173,7 +404,7 @@ class Reader:
             self.logger.error(f"Update failed: key {key} does not exist")
             return utils.generate_response(status="error", message="Failed to update key", status_code=500)
 
-        self._content[key] = value
+        self._set_key(key, value)
         self.write(self._content)
 
         self.logger.info(f"Updated {key} with {value}")
@@ -204,7 +435,26 @@ class Reader:
                 as the data being searched by default. 
         '''
         if data is None:
-            data = self._content
+            parent: dict[str, Any] = self._get_parent(key, parent_key=main_key, unique_parent=True)
+
+            if parent is not None:
+                old_value: Any = parent[key]
+                parent[key] = value
+
+                if isinstance(old_value, dict) or isinstance(value, dict):
+                    self._build_index()
+
+                self.logger.info(f"Updated key {key} with value {utils.format_value(value)}")
+
+                return utils.generate_response(message="Successfully updated key")
+            
+            # ambiguous keys use the recursive search to keep its first match.
+            res: dict[str, Any] = self.update_search(key, value, main_key=main_key, data=self._content)
+
+            if res["status"] == "success":
+                self._build_index()
+            
+            return res
         
         res: dict[str, Any] = utils.generate_response(
             status="error", 
@@ -244,7 +494,7 @@ class Reader:
         self.logger.debug(f"Given data: {data}")
 
         for key, val in data.items():
-            self._content[key] = val
+            self._set_key(key, val)
 
             if key in self._content:
                 self.logger.info(f"Updated key {key} with {val}")
@@ -265,6 +515,7 @@ class Reader:
                 new_content[key] = self._defaults[key]
             
         self._content = new_content
+        self._build_index()
         self.write(self._content)
     
     def delete(self, key: str) -> dict[str, Any]:
@@ -280,7 +531,8 @@ class Reader:
             self.logger.info(f"Key {key} does not exist in {self._content} for removal")
             return utils.generate_response(status="error", message="Unable to find key")
         
-        del self._content[key]
+        value: Any = self._content.pop(key)
+        self._unindex_key(key, value)
         self.write(self._content)
 
         self.logger.info(f"Deleted key {key}")
@@ -302,6 +554,11 @@ class Reader:
                 is set to the content if it is `None`.
         '''
         if data is None:
+            parent: dict[str, Any] = self._get_parent(key)
+
+            if parent is not None:
+                return parent[key]
+
             data = self._content
         if key in data:
             return data[key]
@@ -335,6 +592,11 @@ class Reader:
                 and will be treated as a normal get() if None.
         '''
         if data is None:
+            parent: dict[str, Any] = self._get_parent(key, parent_key=parent_key)
+
+            if parent is not None:
+                return parent[key]
+
             data = self._content
             
         value: Any = None
@@ -354,6 +616,71 @@ class Reader:
 
         return value
 
+    def _get_parent(self, key: str, *, parent_key: str = None, unique_parent: bool = False) -> dict[str, Any] | None:
+        '''Gets the parent dictionary of the key from the index. This is only used for keys that
+        exist once in the Reader, which are the same result as the recursive search.
+
+        None is returned if the key exists in multiple dictionaries, if the parent key is not an
+        ancestor of the key, or if `unique_parent` is True and the parent key exists in multiple dictionaries.
+        '''
+        paths: list[tuple[tuple[str, ...], dict[str, Any]]] = self._index.get(key, [])
+
+        if len(paths) != 1:
+            return None
+        
+        path, parent = paths[0]
+
+        if parent_key is not None:
+            if parent_key not in path:
+                return None
+            if unique_parent and len(self._index.get(parent_key, [])) != 1:
+                return None
+
+        return parent
+
+    def _build_index(self) -> None:
+        '''Builds the index of every key to the paths of its parent dictionaries. 
+        
+        The index holds references to the content, nested values can be changed without rebuilding it.
+        Any structural change, such as adding/removing keys or replacing a dictionary, requires the index to be rebuilt.
+        '''
+        self._index = {}
+
+        stack: list[tuple[tuple[str, ...], dict[str, Any]]] = [((), self._content)]
+
+        while stack:
+            path, data = stack.pop()
+
+            for key, value in data.items():
+                self._index.setdefault(key, []).append((path, data))
+
+                if isinstance(value, dict):
+                    stack.append((path + (key,), value))
+
+    def _set_key(self, key: str, value: Any) -> None:
+        '''Sets a key of the content and updates the index.'''
+        exists: bool = key in self._content
+        old_value: Any = self._content.get(key)
+
+        self._content[key] = value
+
+        if isinstance(old_value, dict) or isinstance(value, dict):
+            self._build_index()
+        elif not exists:
+            self._index.setdefault(key, []).append(((), self._content))
+    
+    def _unindex_key(self, key: str, value: Any) -> None:
+        '''Removes a deleted key of the content from the index.'''
+        if isinstance(value, dict):
+            self._build_index()
+            return
+        
+        paths: list[tuple[tuple[str, ...], dict[str, Any]]] = self._index.get(key, [])
+        paths[:] = [entry for entry in paths if entry[1] is not self._content]
+
+        if not paths:
+            self._index.pop(key, None)
+
     def _mkfiles(self):
         '''Creates the file, including all directories. If they exist, then this does nothing.'''
         if not self._pathpath.parent.exists():
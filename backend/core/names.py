@@ -1,9 +1,14 @@
-from typing import Literal, Callable
+from typing import Literal, Callable, Hashable, Any
+from collections import OrderedDict
+from support.types import CacheStats
+import threading
+import pandas as pd
 
 class NameFormatter:
     '''Class used to format names for the username.'''
     def __init__(self, replace_char: str, case_: Literal["upper", "lower", "title"]):
         self.replace_char: str = replace_char
+        self.case_: Literal["upper", "lower", "title"] = case_
         self.method: Callable[[str], str] = None
 
         match case_:
@@ -39,6 +44,39 @@ class NameFormatter:
     
     def _get_name_split(self, name: str) -> list[str]:
         return name.split()
+    
+    # the Series methods expect stripped names.
+    def replace_series(self, names: pd.Series) -> pd.Series:
+        '''Series version of NameFormatter.replace().'''
+        names = self._case_series(names)
+        return names.str.replace(" ", self.replace_char, regex=False)
+    
+    def f_last_series(self, names: pd.Series) -> pd.Series:
+        '''Series version of NameFormatter.f_last().'''
+        names = self._split_series(names)
+        # the first word is replaced with a space, single names end with a space the same as f_last().
+        names = names.str[0] + names.str.replace(r"^\S*\s?", " ", regex=True)
+
+        return names.str.replace(" ", self.replace_char, regex=False)
+    
+    def first_l_series(self, names: pd.Series) -> pd.Series:
+        '''Series version of NameFormatter.first_l().'''
+        names = self._split_series(names)
+        names = names.str.replace(r"\s?\S*$", " ", n=1, regex=True) + names.str.replace(r"^.*\s", "", regex=True).str[0]
+
+        return names.str.replace(" ", self.replace_char, regex=False)
+    
+    def _case_series(self, names: pd.Series) -> pd.Series:
+        return getattr(names.str, self.case_)()
+    
+    def _split_series(self, names: pd.Series) -> pd.Series:
+        '''Applies the case and replaces all whitespace with single spaces, the same as _get_name_split().'''
+        names = self._case_series(names)
+
+        if names.str.contains(r"\s\s|[^\S ]", regex=True).any():
+            names = names.str.replace(r"\s+", " ", regex=True)
+        
+        return names
 
 class Period(NameFormatter):
     def __init__(self, case_: Literal["upper", "lower", "title"] = "title"):
@@ -50,4 +88,60 @@ class NoSpace(NameFormatter):
     def __init__(self, case_: Literal["upper", "lower", "title"] = "title"):
         replace_char: str = ""
 
-        super().__init__(replace_char, case_)
\ No newline at end of file
+        super().__init__(replace_char, case_)
+
+class NameCache:
+    def __init__(self, max_size: int):
+        '''Bounded LRU cache used for normalized names and formatted usernames. The least
+        recently used entry is removed once the cache is full.
+
+        Parameters
+        ----------
+            max_size: int
+                The max amount of entries in the cache.
+        '''
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        # the API can be called from multiple threads by pywebview.
+        self._lock: threading.Lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Any:
+        '''Gets the value of the key and marks it as recently used. If the key does not exist
+        then None is returned.'''
+        with self._lock:
+            value: Any = self._data.get(key)
+
+            if value is None:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            self._data.move_to_end(key)
+
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        '''Sets the value of the key, removing the least recently used entries if the cache is full.'''
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        '''Removes all entries of the cache. The hit and miss counts are kept.'''
+        with self._lock:
+            self._data.clear()
+    
+    def get_stats(self) -> CacheStats:
+        '''Returns the statistics of the cache.'''
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "max_size": self.max_size,
+        }
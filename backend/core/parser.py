@@ -1,5 +1,6 @@
 from typing import Any, Callable
 import pandas as pd
+import numpy as np
 
 class Parser:
     def __init__(self, df: pd.DataFrame):
@@ -26,25 +27,77 @@ class Parser:
     
     def drop_empty_rows(self, col_name: str) -> int:
         '''Drop rows if a row is empty or NaN based on rows from a given column name. 
-        The DataFrame is modified in place.
+        `Parser.df` is replaced with the filtered DataFrame, it is not modified in place.
+
+        Rows are dropped with a mask, the index of the DataFrame does not need to be a RangeIndex.
 
         It returns the amount of rows dropped, if any.
         '''
         base_len: int = self.length
-        bad_rows: list[int] = []
 
-        for i, data in enumerate(self.get_rows(col_name)):
-            # ensures that if a bad column is read or there are empty
-            # cells (not NaN), then its dropped.
-            if not isinstance(data, str) or data.strip() == "":
-                bad_rows.append(i)
-        
-        self.df.drop(index=bad_rows, axis=0, inplace=True)
+        self.df = self.df[self._get_valid_mask(col_name)]
 
         new_length: int = self.length
 
         return base_len - new_length
     
+    def clean(self, columns: list[str], *, lower: list[str] = None) -> dict[str, int]:
+        '''Vectorized cleaning stage of the DataFrame. `Parser.df` is replaced with the cleaned
+        DataFrame, it is not modified in place. In order, it:
+            1. Drops the rows that are empty or not a string in any of the columns.
+            2. Converts the values of the columns into strings.
+            3. Lowercases the values of the lower columns.
+
+        It returns a dictionary of the column names and the amount of rows dropped by that column.
+
+        Parameters
+        ----------
+            columns: list[str]
+                The column names that are cleaned, they are not case sensitive.
+
+            lower: list[str], default None
+                The column names that are lowercased. These are expected to be in `columns`.
+        '''
+        dropped_rows: dict[str, int] = {}
+        keep: np.ndarray = np.ones(self.length, dtype=bool)
+
+        # the rows are filtered once, the counts are based on the order of the columns.
+        for col_name in columns:
+            mask: np.ndarray = self._get_valid_mask(col_name)
+
+            dropped_rows[col_name] = int(np.count_nonzero(keep & ~mask))
+            keep &= mask
+        
+        self.df = self.df[keep]
+
+        for col_name in columns:
+            col_name = col_name.lower()
+            self.df[col_name] = self.df[col_name].astype(str)
+
+        for col_name in lower or []:
+            col_name = col_name.lower()
+            self.df[col_name] = self.df[col_name].str.lower()
+
+        return dropped_rows
+    
+    def _get_valid_mask(self, col_name: str) -> np.ndarray:
+        '''Returns a boolean mask of the rows of a column that are non-empty strings.'''
+        # ensures that if a bad column is read or there are empty
+        # cells (not NaN), then its dropped.
+        values: pd.Series = self.strip_strings(self.df[col_name.lower()])
+
+        return values.notna().to_numpy() & (values.to_numpy(dtype=object, na_value="") != "")
+    
+    @staticmethod
+    def strip_strings(series: pd.Series) -> pd.Series:
+        '''Returns a new Series with the string values stripped. Values that are not strings
+        are replaced with NaN, the index of the Series is kept.'''
+        try:
+            return series.str.strip()
+        except AttributeError:
+            # raised if the Series has no strings at all (e.g. numbers or only NaN).
+            return pd.Series(np.nan, index=series.index, dtype=object)
+    
     def apply(self, col_name: str, *, func: Callable[[Any], Any], args: tuple = ()) -> None:
         '''Applies a function onto a column and replaces the column values in the DataFrame
         in place.
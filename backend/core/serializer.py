@@ -0,0 +1,39 @@
+from typing import Any
+import json
+
+# optional, the standard library is used if it is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class JSONSerializer:
+    '''Serializer for the JSON files using the standard library. The data is serialized
+    to bytes, allowing the file to be written with a single write call.'''
+    name: str = "json"
+
+    def loads(self, data: bytes) -> Any:
+        '''Deserializes the bytes. Raises a `json.JSONDecodeError` if the data is invalid.'''
+        return json.loads(data)
+
+    def dumps(self, data: Any) -> bytes:
+        '''Serializes the data into bytes.'''
+        return json.dumps(data).encode()
+
+class OrjsonSerializer(JSONSerializer):
+    '''Serializer for the JSON files using `orjson`. This must only be used if `orjson` is installed.'''
+    name: str = "orjson"
+
+    def loads(self, data: bytes) -> Any:
+        # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+        return orjson.loads(data)
+
+    def dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data)
+
+def get_serializer() -> JSONSerializer:
+    '''Gets the fastest available serializer, orjson is used if it is installed.'''
+    if orjson is not None:
+        return OrjsonSerializer()
+
+    return JSONSerializer()
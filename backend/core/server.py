@@ -1,10 +1,13 @@
 from pathlib import Path
 from support.vars import PROJECT_ROOT
+from support.types import Asset
+from core.asset_cache import AssetCache
+from urllib.parse import urlsplit, unquote
 import http.server as http
 import threading, os
 
 class LocalServer:
-    def __init__(self, index_dir: Path | str):
+    def __init__(self, index_dir: Path | str, *, use_cache: bool = True):
         '''Class for creating a local web server. It uses an ephemeral port by default.
         
         Parameters
@@ -12,13 +15,76 @@ class LocalServer:
             index_dir: Path | str
                 The StrPath to the directory holding the HTML file. The HTML file is
                 expected to be an SPA.
+
+            use_cache: bool, default True
+                Loads the files of the directory into an AssetCache, the files are served from memory
+                and compressed if the browser accepts it. Files that are not in the cache are read from the disk.
         '''
+        cache: AssetCache = AssetCache(index_dir) if use_cache else None
+
         # is this allowed? only way i can think of due to parameter issues. it works, whatever.
         class Handler(http.SimpleHTTPRequestHandler):
+            # keep-alive, the connections are reused for the chunks of the SPA.
+            protocol_version: str = "HTTP/1.1"
+            # the headers and the file are sent separately, with nagle the file waits for
+            # the delayed ACK of the headers on a kept alive connection.
+            disable_nagle_algorithm: bool = True
+
             def __init__(self, *args):
                 super().__init__(*args, directory=index_dir)
 
-        self._server: http.HTTPServer = http.HTTPServer(("127.0.0.1", 0), Handler)
+            def do_GET(self):
+                if not self._send_cached(head=False):
+                    super().do_GET()
+
+            def do_HEAD(self):
+                if not self._send_cached(head=True):
+                    super().do_HEAD()
+
+            def _send_cached(self, *, head: bool) -> bool:
+                '''Sends the cached asset of the request path. It returns False if the path is not cached.'''
+                if cache is None:
+                    return False
+
+                asset: Asset = cache.get(unquote(urlsplit(self.path).path))
+                if asset is None:
+                    return False
+
+                encoding: str = AssetCache.choose_encoding(asset, self.headers.get("Accept-Encoding"))
+                etag: str = AssetCache.get_etag(asset, encoding)
+                # weak comparison, W/ prefixes are ignored.
+                match_tags: list[str] = [
+                    tag.strip().removeprefix("W/") for tag in self.headers.get("If-None-Match", "").split(",")
+                ]
+
+                body: bytes = asset["encodings"][encoding]
+                not_modified: bool = etag in match_tags or "*" in match_tags
+
+                self.send_response(304 if not_modified else 200)
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", asset["cache_control"])
+
+                # the response depends on the encoding only if the asset is compressed.
+                if len(asset["encodings"]) > 1:
+                    self.send_header("Vary", "Accept-Encoding")
+
+                if not not_modified:
+                    self.send_header("Content-Type", asset["content_type"])
+                    self.send_header("Content-Length", str(len(body)))
+
+                    if encoding != "identity":
+                        self.send_header("Content-Encoding", encoding)
+
+                self.end_headers()
+
+                if not not_modified and not head:
+                    self.wfile.write(body)
+
+                return True
+
+        # each connection is handled on its own daemonic thread, the browser fetches the assets
+        # in parallel and a kept alive connection does not block the other connections.
+        self._server: http.ThreadingHTTPServer = http.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
 
     def run(self) -> threading.Thread:
         '''Starts the web server on a non-blocking daemonic thread.
@@ -29,6 +95,11 @@ class LocalServer:
         thread.start()
 
         return thread
+
+    def close(self) -> None:
+        '''Stops the web server and closes its socket. The server must be running.'''
+        self._server.shutdown()
+        self._server.server_close()
     
     @property
     def url(self) -> str:
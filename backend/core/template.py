@@ -0,0 +1,61 @@
+from typing import Iterable, Iterator, Literal
+import re
+
+TemplateKey = Literal["USERNAME", "PASSWORD", "NAME"]
+
+_KEY_REGEX: re.Pattern = re.compile(r"\[(USERNAME|PASSWORD|NAME)\]")
+
+class Template:
+    MAX_CHARS: int = 1250
+
+    def __init__(self, text: str):
+        '''Compiled text template. The key words USERNAME, PASSWORD, and NAME enclosed by brackets
+        are parsed once into segments, and each render is a single join of the segments.
+
+        The key words are ***case sensitive***, only uppercase key words are replaced.
+
+        Parameters
+        ----------
+            text: str
+                The template text, it is stripped before being parsed. The max length of the text is
+                `Template.MAX_CHARS`, which must be checked with `Template.is_valid()` before rendering.
+        '''
+        self.text: str = text.strip()
+
+        # split keeps the captured key words at the odd indices.
+        self._segments: list[str] = _KEY_REGEX.split(self.text)
+        self._keys: list[tuple[int, TemplateKey]] = [
+            (i, self._segments[i]) for i in range(1, len(self._segments), 2)
+        ]
+
+    def is_valid(self) -> bool:
+        '''Checks if the text is within the max character length.'''
+        return len(self.text) <= self.MAX_CHARS
+
+    def render(self, username: str = "", password: str = "", name: str = "") -> str:
+        '''Renders the template for a single user. The name is title cased.'''
+        values: dict[TemplateKey, str] = {"USERNAME": username, "PASSWORD": password, "NAME": name.title()}
+
+        segments: list[str] = self._segments.copy()
+        for i, key in self._keys:
+            segments[i] = values[key]
+
+        return "".join(segments)
+
+    def render_many(self, rows: Iterable[tuple[str, str, str]]) -> Iterator[str]:
+        '''Renders the template for each row lazily.
+
+        Parameters
+        ----------
+            rows: Iterable[tuple[str, str, str]]
+                The rows of the users, each row is a tuple of the username, password, and name.
+        '''
+        # no key words, the text is the same for every row.
+        if not self._keys:
+            for _ in rows:
+                yield self.text
+
+            return
+
+        for username, password, name in rows:
+            yield self.render(username, password, name)
@@ -0,0 +1,200 @@
+from support.vars import AZURE_HEADERS
+from logger import Log
+from pathlib import Path
+from typing import Iterable, Callable
+import sqlite3, threading, csv
+
+# the amount of numbered usernames checked per lookup when a username is taken.
+PROBE_SIZE: int = 16
+
+def number_usernames(usernames: list[str], *, 
+        taken: set[str] = None, 
+        lookup: Callable[[list[str]], set[str]] = None,
+        logger: Log = None) -> list[str]:
+    '''Appends the next free number to the usernames that are taken or repeated in the list,
+    before the domain, e.g. `John.Doe@gmail.com` -> `John.Doe1@gmail.com`.
+
+    Parameters
+    ----------
+        usernames: list[str]
+            The usernames to number.
+
+        taken: set[str], default None
+            The lowercased usernames that are already used. It is updated in place with the new usernames.
+
+        lookup: Callable[[list[str]], set[str]], default None
+            Gets the lowercased usernames that are already used from the given numbered usernames,
+            e.g. UsernameIndex.get_existing(). By default it is None, only using `taken`.
+
+        logger: Log, default None
+            Logs the renamed usernames, by default it is None and nothing is logged.
+    '''
+    if taken is None:
+        taken = set()
+
+    # the last number used for each username, avoids checking the same numbers again.
+    suffixes: dict[str, int] = {}
+    new_usernames: list[str] = []
+
+    for username in usernames:
+        key: str = username.lower()
+
+        if key in taken:
+            stem, sep, domain = username.rpartition("@")
+
+            if sep == "":
+                stem, domain = username, ""
+
+            suffix: int = suffixes.get(key, 0)
+            new_username: str = None
+
+            while new_username is None:
+                # the numbers are looked up together instead of one lookup per number.
+                candidates: list[str] = [f"{stem}{num}{sep}{domain}" for num in range(suffix + 1, suffix + 1 + PROBE_SIZE)]
+                existing: set[str] = lookup(candidates) if lookup is not None else set()
+
+                for candidate in candidates:
+                    suffix += 1
+
+                    if candidate.lower() not in taken and candidate.lower() not in existing:
+                        new_username = candidate
+                        break
+
+            suffixes[key] = suffix
+
+            if logger is not None:
+                logger.info(f"Username {username} already exists, using {new_username}")
+
+            username, key = new_username, new_username.lower()
+
+        taken.add(key)
+        new_usernames.append(username)
+
+    return new_usernames
+
+class UsernameIndex:
+    # sqlite has a limit of variables per query, this is below the lowest default limit.
+    _QUERY_CHUNK_SIZE: int = 900
+
+    def __init__(self, path: Path | str, *, logger: Log = None):
+        '''Persistent index of the usernames that were generated, stored in an SQLite database.
+        This is used to find usernames that already exist from previous runs.
+
+        The usernames are stored lowercased, usernames are not case sensitive in Azure.
+
+        Parameters
+        ----------
+            path: Path | str
+                The path of the database file. All folders will be created up to the file.
+
+            logger: Log, default None
+                The logger, by default it is None- creating a new instance with no special features.
+        '''
+        self.logger: Log = logger or Log()
+        self.path: Path = Path(path)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # the API is called from multiple threads, the lock guards the connection.
+        self._lock: threading.Lock = threading.Lock()
+        self._conn: sqlite3.Connection = sqlite3.connect(self.path, check_same_thread=False)
+
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS usernames (username TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def contains(self, username: str) -> bool:
+        '''Checks if the username exists in the index.'''
+        with self._lock:
+            row: tuple = self._conn.execute(
+                "SELECT 1 FROM usernames WHERE username = ?", (username.lower(),)
+            ).fetchone()
+
+        return row is not None
+
+    def get_existing(self, usernames: Iterable[str]) -> set[str]:
+        '''Gets the lowercased usernames that exist in the index from the given usernames.'''
+        keys: list[str] = list({username.lower() for username in usernames})
+        existing: set[str] = set()
+
+        with self._lock:
+            for i in range(0, len(keys), self._QUERY_CHUNK_SIZE):
+                chunk: list[str] = keys[i:i + self._QUERY_CHUNK_SIZE]
+                placeholders: str = ",".join("?" * len(chunk))
+
+                existing.update(
+                    row[0] for row in self._conn.execute(
+                        f"SELECT username FROM usernames WHERE username IN ({placeholders})", chunk
+                    )
+                )
+
+        return existing
+
+    def add_many(self, usernames: Iterable[str]) -> None:
+        '''Adds the usernames to the index, existing usernames are ignored.'''
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO usernames (username) VALUES (?)",
+                ((username.lower(),) for username in usernames)
+            )
+
+    def assign(self, usernames: list[str]) -> list[str]:
+        '''Assigns a free username for each username. If the username exists in the index or
+        was already assigned in the list, the next free number is appended to the username
+        before the domain, e.g. `John.Doe@gmail.com` -> `John.Doe1@gmail.com`.
+
+        The usernames must not be deduplicated beforehand, the duplicates in the list are numbered
+        here together with the usernames of the index.
+
+        The assigned usernames are not added to the index, UsernameIndex.add_many() must be called
+        once the usernames are used.
+        '''
+        return number_usernames(
+            usernames, taken=self.get_existing(usernames), lookup=self.get_existing, logger=self.logger
+        )
+
+    def rebuild(self, output_dir: Path | str) -> int:
+        '''Rebuilds the index from the Azure CSV files, `*-az-bulk-*.csv`, in the output folder.
+        The previous usernames of the index are removed.
+
+        It returns the amount of usernames in the index.
+        '''
+        usernames: set[str] = set()
+
+        for file in Path(output_dir).glob("*-az-bulk-*.csv"):
+            try:
+                usernames.update(self._read_csv_usernames(file))
+            except (OSError, UnicodeDecodeError, csv.Error) as e:
+                self.logger.error(f"Failed to read usernames from {file.name}: {e}")
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM usernames")
+            self._conn.executemany("INSERT OR IGNORE INTO usernames (username) VALUES (?)", ((u,) for u in usernames))
+
+        self.logger.info(f"Rebuilt username index with {len(usernames)} usernames from {output_dir}")
+
+        return len(usernames)
+
+    def close(self) -> None:
+        '''Closes the database connection, the index cannot be used afterwards.'''
+        with self._lock:
+            self._conn.close()
+
+    def _read_csv_usernames(self, file: Path) -> set[str]:
+        '''Reads the lowercased usernames of an Azure CSV file. The version row is skipped if it exists.'''
+        usernames: set[str] = set()
+
+        with open(file, "r", newline="") as csv_file:
+            reader = csv.reader(csv_file)
+            column: int = None
+
+            for row in reader:
+                if column is None:
+                    if AZURE_HEADERS["username"] in row:
+                        column = row.index(AZURE_HEADERS["username"])
+
+                    continue
+
+                if len(row) > column and row[column] != "":
+                    usernames.add(row[column].lower())
+
+        return usernames
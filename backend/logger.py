@@ -1,19 +1,263 @@
-from logging import Logger, DEBUG, Formatter, StreamHandler, FileHandler, Handler, setLoggerClass
+from logging import Logger, DEBUG, Formatter, StreamHandler, FileHandler, Handler, LogRecord, setLoggerClass
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from collections.abc import Sized, Iterable
 from datetime import datetime
-from typing import TypedDict, Literal, TextIO
+from itertools import islice
+from typing import TypedDict, Literal, TextIO, Any, Callable
+from fnmatch import fnmatch
 from pathlib import Path
-import sys
+from queue import Queue
+import sys, atexit, os, gzip, shutil, threading, re
 
 # this value will be the same as soon as the server is launched.
 # this keeps all logs in one day on the same day.
 DEFAULT_FILENAME: str = datetime.now().strftime("%Y-%m-%d.log")
 DEFAULT_DATEFMT: str = "%Y-%m-%d %H:%M:%S"
+# the max amount of items of a collection shown in a lazy log.
+LAZY_MAX_ITEMS: int = 20
+# the max amount of records waiting in the queue of a queued logger.
+LOG_QUEUE_SIZE: int = 10_000
+# the max size of a log file before it is rotated, and the amount of rotated files kept per log file.
+LOG_MAX_BYTES: int = 10 * 1024 * 1024
+LOG_BACKUP_COUNT: int = 5
+# the amount of dated log files kept for a file name, e.g. 14 days of app-%Y-%m-%d.log.
+LOG_MAX_FILES: int = 14
+# the suffixes of the rotated and temporary files of a log file, e.g. app.log.1.gz.
+_ROTATED_SUFFIX_REGEX: re.Pattern = re.compile(r"(\.\d+)?(\.rotating)?(\.gz)?(\.tmp)?$")
 
 class LogLevelOptions(TypedDict):
     log_level: str | int
     stream_level: str | int
     file_level: str | int
 
+class LazyArg:
+    __slots__ = ("value", "max_items")
+
+    def __init__(self, value: Any, max_items: int = LAZY_MAX_ITEMS):
+        '''Argument of a log message that is only converted to a string when the record is formatted.
+
+        Parameters
+        ----------
+            value: Any
+                The value of the argument. If it is callable, it is called when the record is formatted
+                and its return value is used.
+
+            max_items: int, default LAZY_MAX_ITEMS
+                The max amount of items shown if the value is a collection, the rest is replaced
+                with the amount of items left.
+        '''
+        self.value: Any = value
+        self.max_items: int = max_items
+
+    def __str__(self) -> str:
+        value: Any = self.value() if callable(self.value) else self.value
+
+        return truncate(value, self.max_items)
+
+    __repr__ = __str__
+
+def truncate(value: Any, max_items: int = LAZY_MAX_ITEMS) -> str:
+    '''Converts the value into a string, collections with more than the max items are truncated.
+    Only the shown items are converted, the size of the string does not depend on the collection size.'''
+    if isinstance(value, (str, bytes)) or not isinstance(value, Sized) \
+        or not isinstance(value, Iterable) or len(value) <= max_items:
+        return str(value)
+
+    if isinstance(value, dict):
+        items: list[str] = [f"{key!r}: {val!r}" for key, val in islice(value.items(), max_items)]
+
+        return f"{{{', '.join(items)}, ... {len(value) - max_items} more}}"
+
+    items: list[str] = [repr(val) for val in islice(value, max_items)]
+
+    return f"[{', '.join(items)}, ... {len(value) - max_items} more]"
+
+class RotatingLogHandler(RotatingFileHandler):
+    def __init__(self, log_dir: Path, file_name: str, *, 
+            max_bytes: int = LOG_MAX_BYTES, 
+            backup_count: int = LOG_BACKUP_COUNT,
+            max_files: int = LOG_MAX_FILES,
+            clock: Callable[[], datetime] = datetime.now):
+        '''File handler that rotates the log file by size and by time. The rotated files are
+        gzip compressed on a background thread, `<file>.1.gz` being the newest.
+
+        Parameters
+        ----------
+            log_dir: Path
+                The directory of the log files.
+
+            file_name: str
+                The file name of the log, it can contain date formats (e.g. `app-%Y-%m-%d.log`). When the
+                formatted name changes, the current file is compressed and the logs continue in the new file.
+
+            max_bytes: int, default LOG_MAX_BYTES
+                The max size of the log file before it is rotated. If it is 0, it is only rotated by time.
+
+            backup_count: int, default LOG_BACKUP_COUNT
+                The amount of rotated files kept for a log file, the oldest ones are removed.
+
+            max_files: int, default LOG_MAX_FILES
+                The amount of log files of the file name kept, including the current one. When the handler is
+                created and when the file name changes, the files of older names are removed together with their
+                rotated files, and the uncompressed files of previous names are compressed.
+
+            clock: Callable[[], datetime], default datetime.now
+                Gets the current time used to format the file name.
+        '''
+        self._log_dir: Path = log_dir
+        self._file_name: str = file_name
+        self._max_files: int = max_files
+        self._clock: Callable[[], datetime] = clock
+        self._compressor: threading.Thread = None
+        # the file name is only checked once per second, not on every record.
+        self._next_name_check: float = 0
+
+        # matches the file names of every date, e.g. app-*-*-*.log.
+        self._name_glob: str = re.sub(r"%.", "*", file_name)
+
+        super().__init__(self._get_path(), maxBytes=max_bytes, backupCount=backup_count)
+
+        self.namer = lambda name: name + ".gz"
+        self.rotator = self._compress
+
+        self._clean_up()
+
+    def shouldRollover(self, record: LogRecord) -> bool:
+        now: datetime = self._clock()
+
+        if now.timestamp() >= self._next_name_check:
+            self._next_name_check = now.timestamp() + 1
+
+            if self._get_path(now) != self.baseFilename:
+                return True
+
+        return super().shouldRollover(record)
+
+    def doRollover(self) -> None:
+        # the previous file must be compressed before the rotated files are shifted.
+        self._wait_compressor()
+
+        path: str = self._get_path()
+        if path == self.baseFilename:
+            super().doRollover()
+            return
+
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+        # the previous file is compressed by the clean up.
+        self.baseFilename = path
+        self._clean_up()
+
+        if not self.delay:
+            self.stream = self._open()
+
+    def close(self) -> None:
+        self._wait_compressor()
+        super().close()
+
+    def _get_path(self, now: datetime = None) -> str:
+        # same as the base file name, which is always absolute.
+        return os.path.abspath(self._log_dir / (now or self._clock()).strftime(self._file_name))
+
+    def _clean_up(self) -> None:
+        '''Removes the files of the older file names past the max files, and compresses the
+        uncompressed files of the previous file names in the background.'''
+        # the files of each file name, including the rotated and temporary files.
+        groups: dict[str, list[Path]] = {}
+
+        for file in self._log_dir.glob(self._name_glob + "*"):
+            name: str = _ROTATED_SUFFIX_REGEX.sub("", file.name)
+
+            if fnmatch(name, self._name_glob) and file.is_file():
+                groups.setdefault(name, []).append(file)
+
+        current_name: str = os.path.basename(self.baseFilename)
+        previous_names: list[str] = sorted(
+            (name for name in groups if name != current_name),
+            key=lambda name: max(file.stat().st_mtime for file in groups[name]),
+            reverse=True,
+        )
+        kept: int = max(self._max_files - 1, 0)
+
+        for name in previous_names[kept:]:
+            for file in groups[name]:
+                file.unlink(missing_ok=True)
+
+        jobs: list[tuple[str, str]] = []
+
+        for name in previous_names[:kept]:
+            dest: Path = self._log_dir / (name + ".gz")
+
+            for file in groups[name]:
+                if file.name.endswith(".tmp"):
+                    # an interrupted compression, the source still exists.
+                    file.unlink(missing_ok=True)
+                elif file.name in [name, name + ".rotating"]:
+                    if dest.exists():
+                        dest = self._log_dir / (file.name + ".gz")
+
+                    jobs.append((str(file), str(dest)))
+
+        if len(jobs) > 0:
+            self._start_compressor(jobs)
+
+    def _wait_compressor(self) -> None:
+        if self._compressor is not None:
+            self._compressor.join()
+            self._compressor = None
+
+    def _compress(self, source: str, dest: str) -> None:
+        '''Moves the source file aside and compresses it into the destination on a background thread.'''
+        temp_path: str = source + ".rotating"
+        os.replace(source, temp_path)
+
+        self._start_compressor([(temp_path, dest)])
+
+    def _start_compressor(self, jobs: list[tuple[str, str]]) -> None:
+        # not a daemon, the compression finishes before the program exits.
+        self._compressor = threading.Thread(target=self._compress_files, args=(jobs,))
+        self._compressor.start()
+
+    @staticmethod
+    def _compress_files(jobs: list[tuple[str, str]]) -> None:
+        for source, dest in jobs:
+            temp_dest: str = dest + ".tmp"
+
+            try:
+                with open(source, "rb") as src, gzip.open(temp_dest, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+
+                # the clean up orders the files by the time of their last log.
+                shutil.copystat(source, temp_dest)
+                os.replace(temp_dest, dest)
+                os.remove(source)
+            except OSError:
+                # the file is left as is, it is compressed again by the next clean up.
+                continue
+
+class _BlockingQueueHandler(QueueHandler):
+    '''QueueHandler that leaves the formatting and I/O to the listener thread. If the bounded queue is full,
+    the caller waits for space instead of dropping the record.'''
+    def prepare(self, record: LogRecord) -> LogRecord:
+        # the arguments are merged into the message on the calling thread, the listener would otherwise
+        # read lists and dicts after they were modified. this also resolves the lazy arguments, which
+        # are only logged if the level is enabled.
+        # the record stays in the same process, it does not need to be made picklable.
+        record.msg = record.getMessage()
+        record.args = None
+
+        return record
+
+    def enqueue(self, record: LogRecord) -> None:
+        self.queue.put(record)
+
+class _BlockingQueueListener(QueueListener):
+    '''QueueListener that waits for space in the bounded queue to stop the thread.'''
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
 class Log(Logger):
     def __init__(self, 
     name: str = __name__,
@@ -23,7 +267,12 @@ class Log(Logger):
     stream: TextIO = sys.stdout,
     file_name: str = None,
     logfmt: str = "%(asctime)s:%(filename)s:%(name)s [%(levelname)s] %(message)s",
-    datefmt: str = "%Y-%m-%d %H:%M:%S"):
+    datefmt: str = "%Y-%m-%d %H:%M:%S",
+    use_queue: bool = False,
+    queue_size: int = LOG_QUEUE_SIZE,
+    max_bytes: int = LOG_MAX_BYTES,
+    backup_count: int = LOG_BACKUP_COUNT,
+    max_files: int = LOG_MAX_FILES):
         '''Create a new logging instance.
         
         Parameters
@@ -45,13 +294,34 @@ class Log(Logger):
             
             file_name: str, default None
                 The file name of the log. By default it is None and will use an attached date formatted as 
-                `%Y-%m-%d.log`.
+                `%Y-%m-%d.log`. Date formats in the file name are formatted again while logging, and the
+                logs continue in a new file when the formatted name changes.
             
             logfmt: str default TIME FILENAME LOGNAME [LEVEL] MESSAGE
                 The format of the log message.
         
             datefmt: str default YY-MM-DD HH-MM-SS
                 The format for the date of the log.
+
+            use_queue: bool, default False
+                Moves the formatting and I/O of the handlers to a background thread. The log calls
+                only merge the arguments into the message and put the record into a queue.
+                Log.close() must be called to flush the queue, it is also called on exit.
+
+            queue_size: int, default LOG_QUEUE_SIZE
+                The max amount of records in the queue, the log calls wait if the queue is full.
+                This is only used if `use_queue` is True.
+
+            max_bytes: int, default LOG_MAX_BYTES
+                The max size of the log file before it is rotated. If it is 0, the log file is only
+                rotated by the file name date. The rotated files are gzip compressed.
+
+            backup_count: int, default LOG_BACKUP_COUNT
+                The amount of rotated files kept for each log file.
+
+            max_files: int, default LOG_MAX_FILES
+                The amount of log files kept for a date formatted file name, e.g. the last 14 days of
+                `app-%Y-%m-%d.log`. The older files are removed on start and when the date changes.
         '''
         super().__init__(name)
 
@@ -60,8 +330,6 @@ class Log(Logger):
         formatter: Formatter = Formatter(fmt=logfmt, datefmt=datefmt)
         if file_name is None:
             file_name = DEFAULT_FILENAME
-        else:
-            file_name = datetime.now().strftime(file_name)
 
         if log_dir is not None:
             new_log_dir: Path = Path("")
@@ -73,8 +341,9 @@ class Log(Logger):
             if not new_log_dir.exists():
                 new_log_dir.mkdir(parents=True, exist_ok=True)
 
-            log_file: Path = new_log_dir / file_name
-            file_handler = FileHandler(log_file)
+            file_handler = RotatingLogHandler(
+                new_log_dir, file_name, max_bytes=max_bytes, backup_count=backup_count, max_files=max_files
+            )
 
         handlers: list[tuple[str, Handler]] = [
             ("stream_level", stream_handler)
@@ -86,10 +355,77 @@ class Log(Logger):
             hdlr.setFormatter(formatter)
             hdlr.setLevel(levels.get(level_key, DEBUG))
 
-            self.addHandler(hdlr)
+        self._handlers: list[Handler] = [hdlr for _, hdlr in handlers]
+        self._queue_handler: QueueHandler = None
+        self._listener: QueueListener = None
+
+        if use_queue:
+            queue: Queue = Queue(maxsize=queue_size)
+
+            self._queue_handler = _BlockingQueueHandler(queue)
+            self._listener = _BlockingQueueListener(queue, *self._handlers, respect_handler_level=True)
+            self._listener.start()
+
+            self.addHandler(self._queue_handler)
+
+            atexit.register(self.close)
+        else:
+            for hdlr in self._handlers:
+                self.addHandler(hdlr)
 
         self.setLevel(levels.get("log_level", DEBUG))
     
+    def setLevel(self, level: int | str) -> None:
+        super().setLevel(level)
+
+        # the logger is not registered to the logging manager, which only clears the level cache
+        # of registered loggers. without this isEnabledFor() keeps the previous level.
+        self._cache.clear()
+
+    def close(self) -> None:
+        '''Writes the records left in the queue and stops the background thread. Any logs after this
+        are handled on the calling thread. This does nothing if the queue is not used.'''
+        if self._listener is None:
+            return
+
+        # stop() waits until the listener handled every queued record.
+        self._listener.stop()
+        self._listener = None
+
+        self.removeHandler(self._queue_handler)
+        for hdlr in self._handlers:
+            hdlr.flush()
+            self.addHandler(hdlr)
+
+        atexit.unregister(self.close)
+
     def set_logger(self) -> None:
         '''Sets the Log for the logger class for module-level use.'''
-        setLoggerClass(Log) 
\ No newline at end of file
+        setLoggerClass(Log) 
+
+    def lazy(self, level: int, msg: str, *args: Any, max_items: int = LAZY_MAX_ITEMS) -> None:
+        '''Logs a %-style message with lazy arguments. Nothing is done if the level is disabled, and
+        the arguments are only converted to strings when the record is formatted.
+
+        Collections are truncated to the max items, and callable arguments are only called when
+        the record is formatted, e.g. `lazy(DEBUG, "Names: %s", series.to_list)`.
+
+        Parameters
+        ----------
+            level: int
+                The level of the log.
+
+            msg: str
+                The message, the arguments are formatted with `%s`.
+
+            *args: Any
+                The arguments of the message.
+
+            max_items: int, default LAZY_MAX_ITEMS
+                The max amount of items shown for each collection argument.
+        '''
+        if not self.isEnabledFor(level):
+            return
+
+        # stacklevel points the record to the caller instead of this method.
+        self._log(level, msg, tuple(LazyArg(arg, max_items) for arg in args), stacklevel=2)
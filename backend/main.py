@@ -12,6 +12,9 @@ EXCEL_FILE: str = 'excel-mapping.json'
 SETTINGS_FILE: str = 'settings.json'
 OPCO_FILE: str = "opco-mapping.json"
 
+# seconds that settings writes are coalesced for, the UI can update settings rapidly.
+SETTINGS_WRITE_DELAY: float = 0.5
+
 EXCEL_PATH: str = f'{str(PROJECT_ROOT)}/config/{EXCEL_FILE}'
 SETTINGS_PATH: str = f'{str(PROJECT_ROOT)}/config/{SETTINGS_FILE}'
 OPCO_PATH: str = f"{str(PROJECT_ROOT)}/config/{OPCO_FILE}"
@@ -30,12 +33,20 @@ if __name__ == '__main__':
 
     debug, log_path = init_window(LOGS_PATH)
 
-    logger: Log = Log(log_dir=log_path, file_name="app-%Y-%m-%d.log")
+    # the API is called on the UI thread, the log I/O is done in the background.
+    logger: Log = Log(log_dir=log_path, file_name="app-%Y-%m-%d.log", use_queue=True)
 
     logger.debug(f"Log path: {log_path} | URL: {url} | Debug: {debug} | Root: {os.getcwd()}")
 
     excel_reader: Reader = Reader(EXCEL_PATH, defaults=DEFAULT_HEADER_MAP, update_only=True, logger=logger, project_root=PROJECT_ROOT)
-    settings_reader: Reader = Reader(SETTINGS_PATH, defaults=DEFAULT_SETTINGS_MAP, update_only=True, logger=logger, project_root=PROJECT_ROOT)
+    settings_reader: Reader = Reader(
+        SETTINGS_PATH, 
+        defaults=DEFAULT_SETTINGS_MAP, 
+        update_only=True, 
+        logger=logger, 
+        project_root=PROJECT_ROOT, 
+        write_delay=SETTINGS_WRITE_DELAY,
+    )
     opco_reader: Reader = Reader(OPCO_PATH, defaults=DEFAULT_OPCO_MAP, logger=logger, project_root=PROJECT_ROOT)
 
     api: API = API(
@@ -51,4 +62,8 @@ if __name__ == '__main__':
 
     window: webview.Window = webview.create_window(title, url, js_api=api, min_size=size)
     api.set_window(window)
-    webview.start(debug=debug)
\ No newline at end of file
+    webview.start(debug=debug)
+
+    settings_reader.close()
+    api.close_username_index()
+    logger.close()
\ No newline at end of file
@@ -45,12 +45,34 @@ class FileNames(TypedDict):
 class TemplateMap(TypedDict):
     enabled: bool
     text: str
+    workers: int
+    archive: Literal["none", "zip", "tar"]
 
 class Formatting(TypedDict):
     format_type: Literal["period", "no space"]
     format_case: Literal["title", "upper", "lower"]
     format_style: Literal["first last", "f last", "first l"]
 
+class CacheStats(TypedDict):
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+
+class OpcoReport(TypedDict):
+    counts: dict[str, int]
+    unknown: list[str]
+
+class OpcoResolution(OpcoReport):
+    domains: list[str]
+
+class Asset(TypedDict):
+    content_type: str
+    cache_control: str
+    etag: str
+    # the encoding to the content, identity is the uncompressed content.
+    encodings: dict[str, bytes]
+
 class Password(TypedDict):
     length: int
     use_uppercase: bool
@@ -62,6 +84,7 @@ class APISettings(TypedDict):
     output_dir: str
     flatten_csv: bool
     two_name_column_support: bool
+    username_index: bool
     template: TemplateMap
     format: Formatting
     password: Password
@@ -1,12 +1,38 @@
-from core.names import NameFormatter, NoSpace, Period
+from core.names import NameFormatter, NoSpace, Period, NameCache
+from core.template import Template
 from typing import Literal, Any, Callable
-from support.types import Response
+from support.types import Response, Password, OpcoResolution
 from pathlib import Path
-import string, re, uuid, subprocess, sys
+import string, re, uuid, subprocess, sys, secrets
+import numpy as np
+import pandas as pd
 import requests
 
 # NOTE: consider making this file into a class. will need a full backend rewrite however!
 
+# removed characters from names, hyphens are kept for hyphenated names.
+_NAME_TRANSLATE_TABLE: dict[int, None] = str.maketrans(
+    "", "", "".join(c for c in string.punctuation if c != "-") + string.digits
+)
+_VALID_NAME_REGEX: re.Pattern = re.compile(r"^[a-z-]*$")
+_UNWANTED_WORDS: frozenset[str] = frozenset({'jr', 'sr', 'i', 'ii', 'iii', 'iv', 'v', 'vi', 'the', 'of'})
+
+INVALID_NAME: str = "Invalid Name"
+
+_PASSWORD_UPPER: bytes = string.ascii_uppercase.encode()
+_PASSWORD_LOWER: bytes = string.ascii_lowercase.encode()
+_PASSWORD_NUMBERS: bytes = string.digits.encode()
+# TODO: why is this not allowed? this needs to be tested.
+# i'd rather disallow ' " \ | ; / < >
+# ' - % $ are not allowed
+_PASSWORD_PUNCTUATIONS: bytes = ''.join([c for c in string.punctuation if c not in '-%\'']).encode()
+# the amount of passwords generated per random block.
+_PASSWORD_BATCH_SIZE: int = 65_536
+
+# the minimum names to use the Series username formatting by default. with fewer names the
+# overhead of the Series is larger than formatting each name, Excel files are read as one chunk.
+USERNAME_SERIES_THRESHOLD: int = 500_000
+
 def format_name(name: str, *, keep_full: bool = False) -> str:
     '''Formats and validates a name, by default the First and Last name only.
     
@@ -15,34 +41,10 @@ def format_name(name: str, *, keep_full: bool = False) -> str:
         keep_full: bool, default False
             Boolean used to keep the full name instead of keeping only the First and Last.
     '''
-    special_chars: set[str] = set(string.punctuation)
-    
-    chars: list[str] = []
-    for c in name:
-        if c not in special_chars and not c.isdigit():
-            chars.append(c)
-        
-        if c == '-':
-            chars.append('-')
-
-    name: str = ''.join(chars)
-    name_list: list[str] = name.split()
-
-    unwanted_words: set[str] = {'jr', 'sr', 'i', 'ii', 'iii', 'iv', 'v', 'vi', 'the', 'of'}
-
-    new_name: list[str] = []
-
-    for name in name_list:
-        name = name.lower().strip()
-        
-        is_valid: bool = re.match('^([A-Za-z-]*)$', name) != None
-        has_bad_words: bool = name in unwanted_words
-
-        if is_valid and not has_bad_words and len(name) > 1:
-            new_name.append(name.title())
+    new_name: list[str] = _normalize_name(name)
 
     if len(new_name) < 1:
-        return "Invalid Name"
+        return INVALID_NAME
 
     f_name: str = new_name[0]
     if keep_full:
@@ -57,13 +59,79 @@ def format_name(name: str, *, keep_full: bool = False) -> str:
 
     return f'{f_name} {l_name}'
 
-def check_duplicate_names(names: list[str]) -> list[str]:
+def format_names(names: list[str], *, cache: NameCache = None) -> tuple[list[str], list[str]]:
+    '''Formats and validates a list of names. Each name is normalized once for both
+    the First and Last name and the full name, the same as `format_name`. Repeated names
+    are only normalized once.
+
+    It returns a tuple of the First and Last names and the full names.
+
+    Parameters
+    ----------
+        names: list[str]
+            The list of names to format.
+
+        cache: NameCache, default None
+            The cache of the formatted names, keyed by the raw name. Only names missing from
+            the cache are formatted. By default it is None, not using a cache.
+    '''
+    formatted: dict[str, tuple[str, str]] = {}
+    missing: list[str] = []
+
+    for name in dict.fromkeys(names):
+        name_pair: tuple[str, str] = cache.get(name) if cache is not None else None
+
+        if name_pair is None:
+            missing.append(name)
+        else:
+            formatted[name] = name_pair
+
+    for name in missing:
+        new_name: list[str] = _normalize_name(name)
+
+        if len(new_name) < 1:
+            formatted[name] = (INVALID_NAME, INVALID_NAME)
+        else:
+            formatted[name] = (f"{new_name[0]} {new_name[-1]}", f"{' '.join(new_name[0:-1])} {new_name[-1]}")
+
+        if cache is not None:
+            cache.set(name, formatted[name])
+    
+    return [formatted[name][0] for name in names], [formatted[name][1] for name in names]
+
+def _normalize_name(name: str) -> list[str]:
+    '''Returns the valid words of a name in title case. Special characters, digits, and
+    unwanted words are removed.'''
+    name = name.translate(_NAME_TRANSLATE_TABLE)
+
+    # only the ASCII digits are in the translate table, str.isdigit also removes digits such as "²".
+    if not name.isascii():
+        name = "".join(c for c in name if not c.isdigit())
+
+    return [
+        word.title() for word in name.lower().split() 
+        if len(word) > 1 and word not in _UNWANTED_WORDS and _VALID_NAME_REGEX.match(word)
+    ]
+
+def check_duplicate_names(names: list[str], *, seen_names: dict[str, int] = None) -> list[str]:
     '''Checks a list of names for duplicates, if duplicates are found then a number 
     is appended to the name.
 
     The same list will be returned with the modification if it occurred.
+
+    Parameters
+    ----------
+        names: list[str]
+            The list of names to check.
+
+        seen_names: dict[str, int], default None
+            The names that were already seen and their duplicate count. The dictionary is
+            updated in place, this is used to check duplicates across multiple lists of the same
+            file. By default it is None, only checking the given list.
     '''
-    seen_names: dict[str, int] = {}
+    if seen_names is None:
+        seen_names = {}
+
     new_names: list[str] = []
 
     for name in names:
@@ -104,7 +172,10 @@ def generate_usernames(
     *, 
     format_type: Literal["period", "no space"] = "period",
     format_style: Literal["first last", "f last", "first l"] = "first last",
-    format_case: Literal["title", "lower", "upper"] = "title") -> list[str]:
+    format_case: Literal["title", "lower", "upper"] = "title",
+    cache: NameCache = None,
+    resolution: OpcoResolution = None,
+    vectorize: bool = None) -> list[str]:
     '''Generates a list of formatted usernames for Azure. Only the first and last name are
     taken. If dashes exist then it will be removed.
     
@@ -131,6 +202,19 @@ def generate_usernames(
         format_case: Literal["title", "lower", "upper"], default "title"
             Determines the case style of the username. By default it is title case: "first.last" ->
             "First.Last".
+        
+        cache: NameCache, default None
+            The cache of the formatted usernames without the domain. It is keyed by the name and
+            the formatting options. By default it is None, not using a cache.
+        
+        resolution: OpcoResolution, default None
+            The resolved domains of the operating companies from `resolve_opcos()`. By default it is None,
+            resolving the operating companies in the function.
+        
+        vectorize: bool, default None
+            Formats the names with the pandas Series methods of the NameFormatter instead of each name,
+            each unique name is only formatted once. By default it is None, using the Series methods if there
+            are at least `USERNAME_SERIES_THRESHOLD` names.
     '''
     format_dict: dict[str, NameFormatter] = {
         "period": Period,
@@ -142,18 +226,104 @@ def generate_usernames(
         "f last": formatter.f_last,
         "first l": formatter.first_l,
     }
+    style_func: Callable[[str], str] = style_dict[format_style]
+
+    if resolution is None:
+        resolution = resolve_opcos(opcos, opco_map)
+
+    domains: list[str] = resolution["domains"]
+
+    if vectorize is None:
+        vectorize = len(names) >= USERNAME_SERIES_THRESHOLD
+
+    if vectorize:
+        series_style_dict: dict[str, Callable[[pd.Series], pd.Series]] = {
+            "first last": formatter.replace_series,
+            "f last": formatter.f_last_series,
+            "first l": formatter.first_l_series,
+        }
+
+        stems: list[str] = _format_usernames_series(
+            names, series_style_dict[format_style], cache=cache, options=(format_type, format_style, format_case)
+        )
+
+        return [f'{stem}@{domain}' for stem, domain in zip(stems, domains)]
 
-    default_opco: str = opco_map.get('default', "MISSING_DEFAULT.com")
     usernames: list[str] = []
 
     for i, name in enumerate(names):
-        name = format_hyphen_name(name.strip())
-        username: str = style_dict[format_style](name)
+        key: tuple[str, str, str, str] = (name, format_type, format_style, format_case)
+        username: str = cache.get(key) if cache is not None else None
+
+        if username is None:
+            username = style_func(format_hyphen_name(name.strip()))
+
+            if cache is not None:
+                cache.set(key, username)
 
-        usernames.append(f'{username}@{opco_map.get(opcos[i], default_opco)}')
+        usernames.append(f'{username}@{domains[i]}')
 
     return usernames    
 
+def _format_usernames_series(
+    names: list[str], 
+    series_style_func: Callable[[pd.Series], pd.Series],
+    *,
+    cache: NameCache = None,
+    options: tuple[str, str, str] = ()) -> list[str]:
+    '''Formats the names into usernames without the domain with the Series style. Each unique name is
+    formatted once, the names missing from the cache are formatted together.'''
+    codes, uniques = pd.factorize(pd.Series(names, dtype=object))
+    stems: np.ndarray = np.empty(len(uniques), dtype=object)
+    missing: list[int] = []
+
+    for i, name in enumerate(uniques):
+        username: str = cache.get((name, *options)) if cache is not None else None
+
+        if username is None:
+            missing.append(i)
+        else:
+            stems[i] = username
+
+    if len(missing) > 0:
+        series: pd.Series = pd.Series(uniques[missing], dtype=object).str.strip()
+        stems[missing] = series_style_func(format_hyphen_names(series)).to_numpy()
+
+        if cache is not None:
+            for i in missing:
+                cache.set((uniques[i], *options), stems[i])
+
+    return stems.take(codes).tolist()
+
+def resolve_opcos(opcos: list[str], opco_map: dict[str, str]) -> OpcoResolution:
+    '''Resolves the domain of each operating company. Each unique operating company is only
+    looked up once in the map, and the domains are taken from the unique domains.
+
+    It returns an OpcoResolution containing the domains, the count of each operating company,
+    and the operating companies that are not in the map and use the default domain.
+
+    Parameters
+    ----------
+        opcos: list[str]
+            A list of operating companies for each user. If an operating company does not exist in the map,
+            the default value will be used.
+
+        opco_map: dict[str, str]
+            A dictionary used to get the domain based on the operating company.
+    '''
+    default_opco: str = opco_map.get('default', "MISSING_DEFAULT.com")
+
+    codes, uniques = pd.factorize(np.asarray(opcos, dtype=object), use_na_sentinel=False)
+
+    unique_domains: np.ndarray = np.array([opco_map.get(opco, default_opco) for opco in uniques], dtype=object)
+    counts: np.ndarray = np.bincount(codes, minlength=len(uniques))
+
+    return {
+        "domains": unique_domains.take(codes).tolist(),
+        "counts": dict(zip(uniques.tolist(), counts.tolist())),
+        "unknown": [opco for opco in uniques.tolist() if opco not in opco_map],
+    }
+
 def generate_username(
     name: str,
     opco: str,
@@ -227,6 +397,16 @@ def format_hyphen_name(name: str) -> str:
     
     return name
 
+def format_hyphen_names(names: pd.Series) -> pd.Series:
+    '''Series version of format_hyphen_name(), only the names with a hyphen are formatted.'''
+    hyphen_mask: pd.Series = names.str.contains("-", regex=False)
+
+    if hyphen_mask.any():
+        names = names.copy()
+        names[hyphen_mask] = names[hyphen_mask].map(format_hyphen_name)
+    
+    return names
+
 def get_date(date_format: str = '%Y-%m-%dT%H%M%S') -> str:
     '''Get the date, by default it returns the format YY-MM-DD-HHMMSS'''
     from datetime import datetime
@@ -255,41 +435,75 @@ def generate_password(max_length: int = 16, *,
         use_numbers: bool, default `False`
             If true, then numbers are used in the password.
     '''
+    settings: Password = {
+        "length": max_length,
+        "use_punctuations": use_punctuations,
+        "use_uppercase": use_uppercase_letters,
+        "use_numbers": use_numbers,
+    }
+
+    return generate_passwords(1, settings)[0]
+
+def generate_passwords(count: int, settings: Password) -> list[str]:
+    '''Generates a list of random passwords from the password settings. Each password will always 
+    have a minimum of one upper, one lower, and one special character.
+
+    The randomness is drawn from `secrets` in one block for each batch of passwords, and
+    the characters are mapped to the alphabets with numpy.
+
+    Parameters
+    ----------
+        count: int
+            The amount of passwords to generate.
+        
+        settings: Password
+            The password settings, the length and the allowed characters of the passwords.
+    '''
     # FIXME: add a profanity checker?
-    import random, string
+    # need at least one upper, lower, and special
+    length: int = max(settings["length"], 3)
 
-    pw: list[str] = []
+    valid_chars: bytes = _PASSWORD_LOWER
 
-    upper: string = string.ascii_uppercase
-    lower: string = string.ascii_lowercase
-    numbers: string = "0123456789"
+    if settings["use_punctuations"]:
+        valid_chars += _PASSWORD_PUNCTUATIONS
+    if settings["use_uppercase"]:
+        valid_chars += _PASSWORD_UPPER
+    if settings["use_numbers"]:
+        valid_chars += _PASSWORD_NUMBERS
+    
+    # the alphabets of each position are stored in one table, the first three positions
+    # are the required characters.
+    alphabets: list[bytes] = [_PASSWORD_UPPER, _PASSWORD_LOWER, _PASSWORD_PUNCTUATIONS, valid_chars]
+    table: np.ndarray = np.frombuffer(b"".join(alphabets), dtype=np.uint8)
+    starts: list[int] = [sum(len(alpha) for alpha in alphabets[:i]) for i in range(len(alphabets))]
 
-    # TODO: why is this not allowed? this needs to be tested.
-    # i'd rather disallow ' " \ | ; / < >
-    # ' - % $ are not allowed
-    punctuations: string = ''.join([c for c in string.punctuation if c not in '-%\''])
+    offsets: np.ndarray = np.array(starts[:3] + [starts[3]] * (length - 3), dtype=np.uint64)
+    sizes: np.ndarray = np.array(
+        [len(alpha) for alpha in alphabets[:3]] + [len(valid_chars)] * (length - 3), dtype=np.uint64
+    )
 
-    valid_chars: string = lower
+    passwords: list[str] = []
 
-    if use_punctuations:
-        valid_chars += punctuations
-    if use_uppercase_letters:
-        valid_chars += upper
-    if use_numbers:
-        valid_chars += numbers
+    for batch_start in range(0, count, _PASSWORD_BATCH_SIZE):
+        batch_size: int = min(_PASSWORD_BATCH_SIZE, count - batch_start)
 
-    # need at least one upper, lower, and special
-    for seq in [upper, lower, punctuations]:
-        pw.append(random.choice(seq))
+        # one half selects the characters, the other half shuffles them.
+        block: np.ndarray = np.frombuffer(
+            secrets.token_bytes(batch_size * length * 8), dtype=np.uint32
+        ).reshape(2, batch_size, length)
 
-    new_length: int = max_length - 3
+        # maps each 32 bit value to an index of its alphabet.
+        indices: np.ndarray = ((block[0].astype(np.uint64) * sizes) >> np.uint64(32)) + offsets
+        chars: np.ndarray = table[indices]
 
-    for _ in range(new_length):
-        pw.append(random.choice(valid_chars))
-    
-    random.shuffle(pw)
-    
-    return "".join(pw)
+        order: np.ndarray = np.argsort(block[1], axis=1)
+        chars = np.take_along_axis(chars, order, axis=1)
+
+        batch_str: str = chars.tobytes().decode("ascii")
+        passwords.extend(batch_str[i:i + length] for i in range(0, len(batch_str), length))
+
+    return passwords
 
 def generate_text(*, 
     text: str, 
@@ -330,27 +544,19 @@ def generate_text(*,
         name: str, default ''
             Name of the client.
     '''
-    text = text.strip()
-    max_chars: int = 1250
+    template: Template = Template(text)
 
     # this is going to get checked on the front end but it won't hurt to have this just in case.
-    if len(text) > max_chars:
+    if not template.is_valid():
         return generate_response(
             status='error', 
-            message=f'Cannot have a text of over {max_chars} characters.',
+            message=f'Cannot have a text of over {Template.MAX_CHARS} characters.',
             content="",    
         )
-
-    key_words: list[str] = ['USERNAME', 'PASSWORD', 'NAME']
-    data: list[str] = [username, password, name]
-
-    for i in range(len(key_words)):
-        replace_word: str = data[i].title() if key_words[i] == 'NAME' else data[i]
-        text = text.replace(f'[{key_words[i]}]', replace_word)
     
     return generate_response(status='success', 
         message='Successfully generated the text in the output folder.',
-        content=text)
+        content=template.render(username, password, name))
 
 def format_value(value: Any) -> Any:
     '''Formats a value for logging purposes. 
@@ -27,6 +27,13 @@ FILE_NAMES: FileNames = {
     "apps_folder": "apps",
 }
 
+# the amount of rows read at a time for CSV uploads.
+CSV_CHUNK_SIZE: int = 50_000
+# the max amount of entries in each name cache of the API.
+NAME_CACHE_SIZE: int = 100_000
+# stored in the config folder of the project root.
+USERNAME_INDEX_FILE: str = "usernames.db"
+
 MAIN_APP_PATH: Path = PROJECT_ROOT / FILE_NAMES["app_exe"]
 UPDATER_PATH: Path = PROJECT_ROOT.parent / FILE_NAMES["updater_exe"]
 
@@ -62,9 +69,12 @@ DEFAULT_SETTINGS_MAP: APISettings = {
     "output_dir": str(Path().home()),
     "flatten_csv": False,
     "two_name_column_support": False,
+    "username_index": False,
     "template": {
         "enabled": False,
         "text": "",
+        "workers": 4,
+        "archive": "none",
     },
     "format": {
         "format_case": "title",
@@ -1,17 +1,18 @@
 from pathlib import Path
-from backend.api.api import API
+from backend.api.api import API, AzureWriter, TemplateArchive
 from tests.fixtures import api, df, mock
-from typing import Any
+from typing import Any, Callable
 from backend.core.parser import Parser
 from backend.support.vars import DEFAULT_HEADER_MAP, DEFAULT_SETTINGS_MAP, AZURE_HEADERS, VERSION
-from backend.support.types import ManualCSVProps, APISettings, Formatting, Response
+from backend.support.types import ManualCSVProps, APISettings, Formatting, Response, CacheStats
 from io import BytesIO
+from base64 import b64encode
 from unittest.mock import patch, Mock
 import numpy as np
 import pandas as pd
 import backend.support.utils as utils
 import tests.utils as ttils
-import random, string, requests
+import random, string, requests, json, zipfile
 
 def test_generate_csv_normal(tmp_path: Path, api: API, df: pd.DataFrame):
     # creating a baseline dataframe for comparison in the end
@@ -52,6 +53,103 @@ def test_generate_csv_normal(tmp_path: Path, api: API, df: pd.DataFrame):
         if username not in created_usernames:
             raise AssertionError(f"Username {username} not found, CSV generation failed")
 
+def test_generate_csv_chunked(tmp_path: Path, api: API, df: pd.DataFrame):
+    dupe_name: str = "John Doe"
+    df[DEFAULT_HEADER_MAP["name"]] = df[DEFAULT_HEADER_MAP["name"]].apply(
+        func=lambda x: x if random.randint(0, 1) == 0 else dupe_name
+    )
+
+    api.generate_azure_csv(df)
+    base_csv: Path = ttils.get_csv(tmp_path)
+    base_df: pd.DataFrame = pd.read_csv(ttils.get_bytesio(base_csv))
+
+    # small chunks ensures duplicate names are split between chunks.
+    res: Response = api.generate_azure_csv(ttils.get_b64_csv(df), chunk_size=3)
+
+    if res["status"] != "success":
+        raise AssertionError(f"Failed to generate chunked CSV: {res}")
+
+    chunk_csv: Path = ttils.get_csv(tmp_path, ignore_files=[base_csv])
+    chunk_df: pd.DataFrame = pd.read_csv(ttils.get_bytesio(chunk_csv))
+
+    for header in [AZURE_HEADERS["name"], AZURE_HEADERS["username"], AZURE_HEADERS["last_name"]]:
+        assert chunk_df[header].to_list() == base_df[header].to_list()
+
+def test_generate_csv_chunk_error(tmp_path: Path, api: API, df: pd.DataFrame):
+    # pandas decodes the file in blocks, the invalid UTF-8 row fails in a later block after rows were written.
+    large_df: pd.DataFrame = pd.concat([df] * 600, ignore_index=True)
+    data: bytes = large_df.to_csv(index=False).encode() + b"\xff\xfe,\xff\n"
+
+    b64: str = b64encode(data).decode()
+    res: Response = api.generate_azure_csv(
+        {"fileName": "test.csv", "b64": f"data:text/csv;base64,{b64}"}, chunk_size=1000
+    )
+
+    csv_df: pd.DataFrame = pd.read_csv(ttils.get_bytesio(ttils.get_csv(tmp_path)))
+
+    assert res["status"] == "error" and len(csv_df) > 0 \
+        and f"the first {len(csv_df)} rows were already written" in res["message"]
+
+def test_generate_csv_chunk_write_error(tmp_path: Path, api: API, df: pd.DataFrame):
+    # the API uses its own import of the writer.
+    write_rows: Callable = AzureWriter._write_rows
+    calls: list[int] = []
+
+    def fail_second_write(writer: AzureWriter, *args, **kwargs) -> None:
+        calls.append(len(calls))
+
+        if len(calls) == 2:
+            raise OSError("No space left on device")
+
+        write_rows(writer, *args, **kwargs)
+
+    with patch.object(AzureWriter, "_write_rows", autospec=True, side_effect=fail_second_write):
+        res: Response = api.generate_azure_csv(ttils.get_b64_csv(df.iloc[:9]), chunk_size=3)
+
+    csv_df: pd.DataFrame = pd.read_csv(ttils.get_bytesio(ttils.get_csv(tmp_path)))
+
+    # the third chunk is not written after the second one failed.
+    assert res["status"] == "error" and len(calls) == 2 and len(csv_df) == 3 \
+        and "the first 3 rows were already written" in res["message"]
+
+def test_generate_csv_template_archive(tmp_path: Path, api: API, df: pd.DataFrame):
+    api.update_setting("enabled", True, "template")
+    api.update_setting("text", "[NAME] is cool", "template")
+    api.update_setting("archive", "zip", "template")
+
+    # the chunks of the first upload are written to one archive.
+    res: Response = api.generate_azure_csv(ttils.get_b64_csv(df.iloc[:9]), "upload", chunk_size=3)
+    archive_path: Path = Path(next((tmp_path / "templates").iterdir()))
+
+    with zipfile.ZipFile(archive_path) as zip_file:
+        first_names: list[str] = zip_file.namelist()
+
+    add: Callable = TemplateArchive.add
+    calls: list[int] = []
+
+    def fail_fifth_add(archive: TemplateArchive, *args, **kwargs) -> None:
+        calls.append(len(calls))
+
+        if len(calls) == 5:
+            raise OSError("No space left on device")
+
+        add(archive, *args, **kwargs)
+
+    # the second upload of the flatten CSV fails in its second chunk.
+    with patch.object(TemplateArchive, "add", autospec=True, side_effect=fail_fifth_add):
+        fail_res: Response = api.generate_azure_csv(ttils.get_b64_csv(df.iloc[9:18]), "upload", chunk_size=3)
+
+    with zipfile.ZipFile(archive_path) as zip_file:
+        zip_names: list[str] = zip_file.namelist()
+
+    # the nested settings are shared with the defaults, the other template tests use folders.
+    api.update_setting("archive", "none", "template")
+
+    # the published archive is not changed by the failed upload, and the temporary archive is removed.
+    assert res["status"] == "success" and len(first_names) == 9 and zip_names == first_names \
+        and fail_res["status"] == "error" and "failed to generate text files" in fail_res["message"] \
+        and [file.name for file in (tmp_path / "templates").iterdir()] == [archive_path.name]
+
 def test_generate_csv_empty_names(tmp_path: Path, api: API, df: pd.DataFrame):
     parser: Parser = Parser(df) 
 
@@ -192,6 +290,61 @@ def test_generate_csv_multiple_template(tmp_path: Path, api: API, df: pd.DataFra
     assert base_len == csv_count and base_len == template_folder_count and \
         template_count == base_row_len
 
+def test_generate_csv_excel(tmp_path: Path, api: API, df: pd.DataFrame):
+    api.generate_azure_csv(df)
+    base_csv: Path = ttils.get_csv(tmp_path)
+    base_df: pd.DataFrame = pd.read_csv(ttils.get_bytesio(base_csv))
+
+    # only the mapped columns are read, the header case does not matter.
+    excel_df: pd.DataFrame = df.rename(mapper=lambda x: x.title(), axis=1)
+    excel_df["Unmapped"] = range(len(excel_df))
+
+    res: Response = api.generate_azure_csv(ttils.get_b64_excel(excel_df))
+
+    if res["status"] != "success":
+        raise AssertionError(f"Failed to generate CSV from Excel: {res}")
+
+    excel_csv: Path = ttils.get_csv(tmp_path, ignore_files=[base_csv])
+    new_df: pd.DataFrame = pd.read_csv(ttils.get_bytesio(excel_csv))
+
+    for header in [AZURE_HEADERS["name"], AZURE_HEADERS["username"], AZURE_HEADERS["last_name"]]:
+        assert new_df[header].to_list() == base_df[header].to_list()
+
+def test_fail_generate_csv_excel_columns(api: API, df: pd.DataFrame):
+    excel_df: pd.DataFrame = df.rename(mapper=lambda x: f"{x} unmapped", axis=1)
+
+    res: Response = api.generate_azure_csv(ttils.get_b64_excel(excel_df))
+
+    assert res["status"] == "error" and "missing" in res["message"]
+
+def test_generate_csv_wide(tmp_path: Path, api: API, df: pd.DataFrame):
+    api.generate_azure_csv(df)
+    base_csv: Path = ttils.get_csv(tmp_path)
+    base_df: pd.DataFrame = pd.read_csv(ttils.get_bytesio(base_csv))
+
+    # only the mapped columns are parsed, the header case does not matter.
+    wide_df: pd.DataFrame = df.rename(mapper=lambda x: x.upper(), axis=1)
+    for i in range(80):
+        wide_df[f"unmapped {i}"] = i
+
+    res: Response = api.generate_azure_csv(ttils.get_b64_csv(wide_df), chunk_size=5)
+
+    if res["status"] != "success":
+        raise AssertionError(f"Failed to generate CSV from wide CSV: {res}")
+
+    wide_csv: Path = ttils.get_csv(tmp_path, ignore_files=[base_csv])
+    new_df: pd.DataFrame = pd.read_csv(ttils.get_bytesio(wide_csv))
+
+    for header in [AZURE_HEADERS["name"], AZURE_HEADERS["username"], AZURE_HEADERS["last_name"]]:
+        assert new_df[header].to_list() == base_df[header].to_list()
+
+def test_fail_generate_csv_columns(api: API, df: pd.DataFrame):
+    csv_df: pd.DataFrame = df.rename(mapper=lambda x: f"{x} unmapped", axis=1)
+
+    res: Response = api.generate_azure_csv(ttils.get_b64_csv(csv_df))
+
+    assert res["status"] == "error" and "missing" in res["message"]
+
 def test_generate_csv_empty_file(api: API, df: pd.DataFrame):
     empty_df: pd.DataFrame = df.copy(deep=True).iloc[0:0]
 
@@ -502,6 +655,20 @@ def test_generate_csv_flatten_templates(tmp_path: Path, api: API, df: pd.DataFra
     
     assert base_len == template_len
 
+def test_name_cache_stats(api: API, df: pd.DataFrame):
+    for _ in range(2):
+        api.generate_azure_csv(df)
+
+    stats: dict[str, CacheStats] = api.get_cache_stats()["content"]
+
+    # the second run is all hits
+    assert stats["names"]["hits"] > 0 and stats["usernames"]["hits"] > 0 \
+        and stats["names"]["misses"] == stats["names"]["size"]
+
+    api.update_setting("format_case", "lower", "format")
+
+    assert api.get_cache_stats()["content"]["usernames"]["size"] == 0
+
 def test_get_value(api: API):
     excel_val: Any = api.get_reader_value("excel", "name")
     settings_val: Any = api.get_reader_value("settings", "output_dir")
@@ -674,4 +841,55 @@ def test_exception_check_version(mock: Mock, api: API):
     url: str = "https://afakeurl-goeshere.com/api/text.txt"
     res: Response = api.check_version(url)
 
-    assert res["status"] == "error"
\ No newline at end of file
+    assert res["status"] == "error"
+
+def test_generate_manual_csv_external_opco(tmp_path: Path, api: API):
+    opco_path: Path = api.opco.get_path()
+    opco_map: dict[str, str] = api.opco.read()
+
+    # simulates an external edit of the opco map
+    with open(opco_path, "w") as file:
+        json.dump({**opco_map, "new company": "newcompany.com"}, file)
+    
+    res: Response = api.generate_manual_csv([{"name": "John Doe", "opco": "New Company"}])
+
+    assert res["status"] == "success" and api.opco.get("new company") == "newcompany.com" \
+        and res["opcos"] == {"counts": {"new company": 1}, "unknown": []}
+
+    file: Path = next(path for path in tmp_path.iterdir() if path.suffix == ".csv")
+    new_df: pd.DataFrame = pd.read_csv(ttils.get_bytesio(file))
+
+    assert new_df[AZURE_HEADERS["username"]].str.endswith("@newcompany.com").all()
+
+def test_username_index(tmp_path: Path, api: API):
+    api.update_setting("username_index", True)
+
+    user: ManualCSVProps = {"name": "John Doe", "opco": "company one"}
+
+    # the same user is generated across runs, the later runs must not reuse the usernames.
+    for content in [[user], [user], [user, user]]:
+        res: Response = api.generate_manual_csv(content)
+
+        assert res["status"] == "success"
+
+    def get_usernames() -> list[str]:
+        usernames: list[str] = []
+        for file in tmp_path.glob("*-az-bulk-*.csv"):
+            usernames.extend(pd.read_csv(ttils.get_bytesio(file))[AZURE_HEADERS["username"]].to_list())
+
+        return usernames
+
+    usernames: list[str] = get_usernames()
+
+    # the format settings can differ, only the suffix is checked.
+    stem, domain = sorted(usernames)[-1].split("@")
+
+    assert sorted(usernames) == sorted([f"{stem}{suffix}@{domain}" for suffix in ["", "1", "2", "3"]])
+
+    api.close_username_index()
+    (tmp_path / "config" / "usernames.db").unlink()
+
+    res = api.rebuild_username_index()
+    api.generate_manual_csv([user])
+
+    assert res["status"] == "success" and res["content"] == 4 and f"{stem}4@{domain}" in get_usernames()
@@ -0,0 +1,131 @@
+from backend.core.serializer import JSONSerializer, OrjsonSerializer, orjson
+from backend.core.json_reader import Reader
+from backend.core.excel_reader import read_excel, python_calamine
+from backend.core.csv_reader import read_csv
+from backend.support.vars import DEFAULT_OPCO_MAP, DEFAULT_HEADER_MAP, CSV_CHUNK_SIZE
+from io import BytesIO
+from base64 import b64encode, b64decode
+from pathlib import Path
+from typing import Any, Callable
+import pandas as pd
+import pytest, time, os
+
+# the benchmarks are slow, they only run if BENCHMARK is set, e.g. `BENCHMARK=1 pytest tests/test_benchmark.py`.
+# the timings are recorded as test properties, e.g. with `--junitxml`.
+pytestmark = pytest.mark.skipif(not os.environ.get("BENCHMARK"), reason="BENCHMARK is not set")
+
+OPCO_SIZE: int = 10_000
+ROUNDS: int = 20
+
+# writing the larger workbooks takes minutes, they are only used if BENCHMARK_LARGE is also set.
+EXCEL_SIZES: list[int] = [10_000, 100_000, 500_000] if os.environ.get("BENCHMARK_LARGE") else [10_000]
+CSV_SIZE: int = 50_000
+CSV_COLUMNS: int = 80
+
+excel_engines: list[Any] = [
+    "openpyxl",
+    pytest.param("calamine", marks=pytest.mark.skipif(python_calamine is None, reason="python-calamine is not installed")),
+]
+
+serializers: list[Any] = [
+    JSONSerializer(),
+    pytest.param(
+        OrjsonSerializer() if orjson is not None else None,
+        marks=pytest.mark.skipif(orjson is None, reason="orjson is not installed"),
+    ),
+]
+
+def get_opco_map(size: int) -> dict[str, str]:
+    opco_map: dict[str, str] = {"default": DEFAULT_OPCO_MAP["default"]}
+
+    for i in range(size):
+        opco_map[f"operating company {i}"] = f"company{i}.example.org"
+
+    return opco_map
+
+@pytest.mark.parametrize("serializer", serializers)
+def test_serializer_benchmark(tmp_path: Path, serializer: JSONSerializer, record_property: Callable[[str, Any], None]):
+    opco_map: dict[str, str] = get_opco_map(OPCO_SIZE)
+
+    reader: Reader = Reader(
+        tmp_path / "opco.json", defaults=DEFAULT_OPCO_MAP, is_test=True, project_root=tmp_path, serializer=serializer
+    )
+    reader.insert_many(opco_map)
+
+    start: float = time.perf_counter()
+    for _ in range(ROUNDS):
+        payload: bytes = serializer.dumps(opco_map)
+    dump_time: float = (time.perf_counter() - start) / ROUNDS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        content: dict[str, str] = serializer.loads(payload)
+    load_time: float = (time.perf_counter() - start) / ROUNDS
+
+    record_property("dump_ms", round(dump_time * 1000, 2))
+    record_property("load_ms", round(load_time * 1000, 2))
+
+    assert content == opco_map and reader.read() == reader.get_content()
+
+def get_workbook(size: int) -> bytes:
+    '''Creates an Excel workbook with the mapped columns and unmapped columns.'''
+    df: pd.DataFrame = pd.DataFrame({
+        DEFAULT_HEADER_MAP["name"].title(): [f"First{i} Last{i}" for i in range(size)],
+        DEFAULT_HEADER_MAP["opco"].title(): [f"operating company {i % 100}" for i in range(size)],
+        "Country/Territory": ["Country"] * size,
+        "Number": range(size),
+        "Short Description": [f"Description of the request {i}" for i in range(size)],
+    })
+
+    buffer: BytesIO = BytesIO()
+    df.to_excel(buffer, index=False)
+
+    return buffer.getvalue()
+
+@pytest.mark.parametrize("size", EXCEL_SIZES)
+@pytest.mark.parametrize("engine", excel_engines)
+def test_excel_benchmark(size: int, engine: str, record_property: Callable[[str, Any], None]):
+    workbook: bytes = get_workbook(size)
+
+    # the previous read, every column with inferred types.
+    start: float = time.perf_counter()
+    full_df: pd.DataFrame = pd.read_excel(BytesIO(workbook), engine="openpyxl")
+    full_time: float = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df: pd.DataFrame = read_excel(BytesIO(workbook), DEFAULT_HEADER_MAP.values(), engine=engine)
+    read_time: float = time.perf_counter() - start
+
+    record_property("read_s", round(read_time, 2))
+    record_property("baseline_s", round(full_time, 2))
+
+    # openpyxl reads the whole sheet, the same as the previous read.
+    assert len(df) == len(full_df) and len(df.columns) == (len(full_df.columns) if engine == "openpyxl" else 2)
+
+def test_csv_benchmark(record_property: Callable[[str, Any], None]):
+    # HR exports have many columns, only two are used.
+    df: pd.DataFrame = pd.DataFrame({
+        DEFAULT_HEADER_MAP["name"].title(): [f"First{i} Last{i}" for i in range(CSV_SIZE)],
+        DEFAULT_HEADER_MAP["opco"].title(): [f"operating company {i % 100}" for i in range(CSV_SIZE)],
+    })
+    for i in range(CSV_COLUMNS):
+        df[f"Column {i}"] = range(CSV_SIZE) if i % 2 == 0 else f"value {i}"
+
+    b64: str = "data:text/csv;base64," + b64encode(df.to_csv(index=False).encode()).decode()
+    start_index: int = b64.find(",") + 1
+
+    # the previous read, every column with inferred types.
+    start: float = time.perf_counter()
+    full_rows: int = sum(
+        len(chunk) for chunk in pd.read_csv(BytesIO(b64decode(b64[start_index:])), chunksize=CSV_CHUNK_SIZE)
+    )
+    full_time: float = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chunks: list[pd.DataFrame] = list(read_csv(b64, start_index, DEFAULT_HEADER_MAP.values()))
+    read_time: float = time.perf_counter() - start
+
+    record_property("read_s", round(read_time, 2))
+    record_property("baseline_s", round(full_time, 2))
+
+    assert sum(len(chunk) for chunk in chunks) == full_rows and all(len(chunk.columns) == 2 for chunk in chunks)
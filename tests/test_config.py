@@ -2,6 +2,8 @@ from pathlib import Path
 from backend.core.json_reader import Reader
 from typing import Any
 from tests.fixtures import reader, settings_reader
+from unittest.mock import patch
+import pytest, time, json
 from backend.support.vars import DEFAULT_HEADER_MAP, DEFAULT_OPCO_MAP, DEFAULT_SETTINGS_MAP
 
 # NOTE: DEFAULT_HEADER_MAP is the default map for reader.
@@ -161,4 +163,116 @@ def test_delete_config(reader: Reader):
         if file.suffix == ".json":
             config_count += 1
 
-    assert path.exists() and not og_file_exist and config_count == 1 and reader.read() == base_data
\ No newline at end of file
+    assert path.exists() and not og_file_exist and config_count == 1 and reader.read() == base_data
+
+def test_batch(reader: Reader):
+    base_data: dict[str, Any] = reader.read()
+
+    with patch.object(reader, "write", wraps=reader.write) as write:
+        with reader.batch():
+            for i in range(100):
+                reader.insert(f"key{i}", i)
+
+            with reader.batch():
+                reader.update("key0", "updated")
+            
+            # nothing is written until the batch exits
+            assert reader.read() == base_data
+    
+    # 102 calls from the mutations and one final flush
+    assert write.call_count == 102 and reader.read() == reader.get_content() \
+        and reader.read()["key0"] == "updated" and reader.read()["key99"] == 99
+
+def test_batch_rollback(reader: Reader):
+    base_data: dict[str, Any] = reader.read()
+
+    with pytest.raises(ValueError):
+        with reader.batch():
+            reader.insert("key", True)
+
+            raise ValueError("Failed batch")
+    
+    assert reader.read() == base_data and reader.get_content() == base_data
+
+def test_delayed_write(tmp_path: Path):
+    reader: Reader = Reader(
+        tmp_path / "delayed.json", defaults=DEFAULT_HEADER_MAP, is_test=True, project_root=tmp_path, write_delay=0.5
+    )
+    base_data: dict[str, Any] = reader.read()
+
+    with patch.object(reader, "_write_file", wraps=reader._write_file) as write_file:
+        for i in range(50):
+            reader.insert(f"key{i}", i)
+        
+        assert reader.read() == base_data
+
+        # the flusher writes once after the delay
+        for _ in range(100):
+            if reader.read() == reader.get_content():
+                break
+
+            time.sleep(0.05)
+
+        assert write_file.call_count == 1 and reader.read() == reader.get_content()
+
+        reader.update("key0", "updated")
+        reader.close()
+
+        assert write_file.call_count == 2 and reader.read()["key0"] == "updated"
+
+    # writes after closing are immediate
+    reader.update("key1", "updated")
+
+    assert reader.read()["key1"] == "updated"
+
+def test_indexed_search(reader: Reader):
+    reader.insert("nest1", {"padding": 1, "nest2": {"padding": 2, "unique": 3, "nest3": {"deep": 4}}})
+    reader.insert("nest4", {"padding": 5, "nest3": {"deep": 6, "other": 7}})
+    reader.insert("nest5", {"nest6": {"value": 8}})
+
+    content: dict[str, Any] = reader.get_content()
+    keys: list[str] = ["padding", "unique", "deep", "other", "value", "nest3", "missing"]
+    parents: list[str] = [None, "nest1", "nest2", "nest3", "nest4", "nest5", "nest6"]
+
+    # the index must return the same values as the recursive search
+    for key in keys:
+        assert reader.get(key) == reader.get(key, data=content)
+
+        for parent in parents:
+            assert reader.get_search(key, parent_key=parent) == reader.get_search(key, data=content, parent_key=parent)
+    
+    assert reader.update_search("value", "updated", main_key="nest5")["status"] == "success"
+    assert reader.update_search("deep", "updated", main_key="nest4")["status"] == "success"
+    assert reader.update_search("missing", "updated")["status"] == "error"
+
+    assert reader.get("value") == "updated" and reader.get("nest4")["nest3"]["deep"] == "updated" \
+        and reader.get("nest2")["nest3"]["deep"] == 4
+
+    # structural changes are reflected in the index
+    reader.update_search("nest6", {"new": 9})
+    reader.delete("nest1")
+
+    assert reader.get("new") == 9 and reader.get("value") is None and reader.get("unique") is None \
+        and reader.get_search("deep", parent_key="nest3") == "updated"
+
+def test_reload_if_changed(reader: Reader):
+    path: Path = reader.get_path()
+
+    # writes from the Reader are not external changes
+    reader.insert("key", "value")
+
+    assert not reader.reload_if_changed()
+
+    content: dict[str, Any] = reader.read()
+
+    with open(path, "w") as file:
+        json.dump({**content, "external key": "external value"}, file)
+
+    assert reader.reload_if_changed() and reader.get("external key") == "external value"
+    assert not reader.reload_if_changed()
+
+    # invalid files keep the current content
+    with open(path, "w") as file:
+        file.write('{"key": ')
+
+    assert not reader.reload_if_changed() and reader.get("external key") == "external value"
@@ -4,14 +4,17 @@ from backend.support.vars import DEFAULT_HEADER_MAP, DEFAULT_OPCO_MAP, AZURE_HEA
 from backend.support.types import Response
 from backend.core.azure_writer import AzureWriter, HeadersKey
 from backend.core.parser import Parser
+from backend.core.csv_reader import get_csv_columns
+from backend.core.excel_reader import read_excel
 from tests.fixtures import df
 from faker import Faker
 from io import BytesIO
+from base64 import b64encode
 import pandas as pd
 import backend.support.utils as utils
 import tests.utils as ttils
 import numpy as np
-import random
+import random, pytest
 
 # this is faked and cleaned data, no sensitive leaks.
 test_json: Path = Path(__file__).parent / "data.json"
@@ -30,6 +33,26 @@ def test_read_excel():
 
     assert len(parser.get_columns()) > 0
 
+@pytest.mark.parametrize("engine", ["openpyxl", "calamine"])
+def test_read_excel_engine(engine: str):
+    excel_df: pd.DataFrame = pd.DataFrame({
+        "Full Name": ["John Doe", 123, None, "Jane Doe"],
+        "Operating Company": ["company one", "company two", "company three", None],
+        "Number": [1, 2, 3, 4],
+    })
+
+    buffer: BytesIO = BytesIO()
+    excel_df.to_excel(buffer, index=False)
+
+    df: pd.DataFrame = read_excel(BytesIO(buffer.getvalue()), [FULL_NAME, OPERATING_COMPANY], engine=engine)
+
+    parser: Parser = Parser(df)
+    dropped_rows: dict[str, int] = parser.clean([FULL_NAME, OPERATING_COMPANY])
+
+    # the numeric name is dropped with both engines, it is not read as a string.
+    assert df[["Full Name", "Operating Company"]].equals(excel_df[["Full Name", "Operating Company"]]) \
+        and dropped_rows == {FULL_NAME: 2, OPERATING_COMPANY: 1} and parser.get_rows(FULL_NAME) == ["John Doe"]
+
 def test_get_excel_data():
     df: pd.DataFrame = pd.read_json(test_json)
     parser: Parser = Parser(df)
@@ -88,4 +111,32 @@ def test_drop_validate_data(df: pd.DataFrame):
 
     dropped_rows: int = dropped_name_rows + dropped_opco_rows
 
-    assert dropped_rows != 0
\ No newline at end of file
+    assert dropped_rows != 0
+
+def test_drop_non_range_index(df: pd.DataFrame):
+    # chunks and filtered frames do not start at 0.
+    df.index = [i * 3 + 100 for i in range(len(df))]
+
+    df.loc[df.index[0], DEFAULT_HEADER_MAP["name"]] = np.nan
+    df.loc[df.index[1], DEFAULT_HEADER_MAP["name"]] = "   "
+    df.loc[df.index[2], DEFAULT_HEADER_MAP["opco"]] = 100
+
+    parser: Parser = Parser(df)
+    dropped_rows: dict[str, int] = parser.clean(
+        [DEFAULT_HEADER_MAP["name"], DEFAULT_HEADER_MAP["opco"]], 
+        lower=[DEFAULT_HEADER_MAP["opco"]]
+    )
+
+    opcos: list[str] = parser.get_rows(DEFAULT_HEADER_MAP["opco"])
+
+    assert dropped_rows[DEFAULT_HEADER_MAP["name"]] == 2 and dropped_rows[DEFAULT_HEADER_MAP["opco"]] == 1 \
+        and parser.length == len(df) - 3 and all(opco == opco.lower() for opco in opcos)
+
+def test_get_csv_columns():
+    # BOM, quoted headers, and duplicate headers.
+    text: str = '\ufeffFull Name,"Country, Territory",OPERATING COMPANY,full name\nJohn Doe,US,Company,Jane Doe\n'
+    data_url: str = "data:text/csv;base64," + b64encode(text.encode()).decode()
+
+    columns: list[str] = get_csv_columns(data_url, data_url.find(",") + 1, DEFAULT_HEADER_MAP.values())
+
+    assert columns == ["Full Name", "OPERATING COMPANY", "full name"]
@@ -0,0 +1,120 @@
+from backend.logger import Log, LazyArg, RotatingLogHandler, truncate
+from logging import DEBUG, INFO
+from io import StringIO
+from pathlib import Path
+from datetime import datetime
+import pandas as pd
+import gzip, os
+
+def test_lazy_truncate():
+    stream: StringIO = StringIO()
+    logger: Log = Log(stream=stream)
+
+    logger.lazy(DEBUG, "Names: %s | Opcos: %s", pd.Series(range(1000)), {i: str(i) for i in range(5)}, max_items=3)
+
+    output: str = stream.getvalue()
+
+    assert "Names: [0, 1, 2, ... 997 more]" in output and "Opcos: {0: '0', 1: '1'" in output \
+        and "test_logger.py" in output
+
+def test_lazy_disabled():
+    stream: StringIO = StringIO()
+    logger: Log = Log(stream=stream)
+    logger.setLevel(INFO)
+
+    def fail() -> str:
+        raise AssertionError("Lazy argument was evaluated on a disabled level")
+
+    logger.lazy(DEBUG, "Names: %s", fail)
+
+    assert stream.getvalue() == "" and truncate("a" * 100, 3) == "a" * 100
+
+def test_queue(tmp_path: Path):
+    stream: StringIO = StringIO()
+    logger: Log = Log(stream=stream, log_dir=tmp_path, file_name="queue.log", use_queue=True, queue_size=10)
+
+    names: list[str] = ["John Doe"]
+
+    for i in range(100):
+        logger.info("Record %s", i)
+
+    # the arguments are formatted before the record is queued.
+    logger.info("Names: %s | %s", names, LazyArg(names))
+    names.append("Jane Doe")
+
+    logger.close()
+
+    output: str = stream.getvalue()
+    file_output: str = (tmp_path / "queue.log").read_text()
+
+    # logs after closing are written directly.
+    logger.info("Closed")
+
+    assert output.count("Record") == 100 and file_output.count("Record") == 100 \
+        and "Record 99" in file_output and "Closed" in stream.getvalue() \
+        and "Names: ['John Doe'] | ['John Doe']" in file_output and "Jane Doe" not in output
+
+def test_rotate(tmp_path: Path):
+    logger: Log = Log(stream=StringIO(), log_dir=tmp_path, file_name="rotate.log", max_bytes=2000, backup_count=2)
+
+    for i in range(200):
+        logger.info("Record %s", i)
+
+    for hdlr in logger.handlers:
+        hdlr.close()
+
+    rotated: list[Path] = sorted(tmp_path.glob("rotate.log.*"))
+    newest: str = gzip.decompress((tmp_path / "rotate.log.1.gz").read_bytes()).decode()
+    current: str = (tmp_path / "rotate.log").read_text()
+
+    assert [file.name for file in rotated] == ["rotate.log.1.gz", "rotate.log.2.gz"] \
+        and "Record 199" in current and "Record 0 " not in newest and newest.count("Record") > 0
+
+def test_rotate_file_name(tmp_path: Path):
+    dates: list[datetime] = [datetime(2025, 1, 1)]
+    handler: RotatingLogHandler = RotatingLogHandler(tmp_path, "rotate-%Y-%m-%d.log", clock=lambda: dates[-1])
+
+    logger: Log = Log(stream=StringIO())
+    logger.addHandler(handler)
+    logger.info("Previous file")
+
+    dates.append(datetime(2025, 1, 2))
+    logger.info("Next file")
+    handler.close()
+
+    previous: str = gzip.decompress((tmp_path / "rotate-2025-01-01.log.gz").read_bytes()).decode()
+
+    assert "Previous file" in previous and not (tmp_path / "rotate-2025-01-01.log").exists() \
+        and "Next file" in (tmp_path / "rotate-2025-01-02.log").read_text()
+
+def test_rotate_clean_up(tmp_path: Path):
+    # leftovers of previous runs, the newest previous file was never compressed.
+    for day in range(1, 5):
+        (tmp_path / f"app-2025-01-0{day}.log.1.gz").write_bytes(gzip.compress(b"Old"))
+        (tmp_path / f"app-2025-01-0{day}.log").write_text(f"Day {day}")
+        os.utime(tmp_path / f"app-2025-01-0{day}.log", (day * 86400, day * 86400))
+        os.utime(tmp_path / f"app-2025-01-0{day}.log.1.gz", (day * 86400, day * 86400))
+
+    (tmp_path / "updater-2025-01-01.log").write_text("Updater")
+
+    dates: list[datetime] = [datetime(2025, 1, 5)]
+    handler: RotatingLogHandler = RotatingLogHandler(
+        tmp_path, "app-%Y-%m-%d.log", max_files=3, clock=lambda: dates[-1]
+    )
+
+    logger: Log = Log(stream=StringIO())
+    logger.addHandler(handler)
+    logger.info("Day 5")
+
+    dates.append(datetime(2025, 1, 6))
+    logger.info("Day 6")
+    handler.close()
+
+    names: list[str] = sorted(file.name for file in tmp_path.iterdir())
+    day_5: str = gzip.decompress((tmp_path / "app-2025-01-05.log.gz").read_bytes()).decode()
+
+    # day 4 was compressed on start, and day 5 when the date changed.
+    assert names == [
+        "app-2025-01-04.log.1.gz", "app-2025-01-04.log.gz", "app-2025-01-05.log.gz",
+        "app-2025-01-06.log", "updater-2025-01-01.log"
+    ] and "Day 5" in day_5 and gzip.decompress((tmp_path / "app-2025-01-04.log.gz").read_bytes()) == b"Day 4"
@@ -0,0 +1,88 @@
+from backend.core.server import LocalServer
+from http.client import HTTPConnection, HTTPResponse
+from pathlib import Path
+import pytest, gzip
+
+SCRIPT: str = "console.log('test');"
+LARGE_SCRIPT: str = "export const names = ['John Doe', 'Jane Doe'];\n" * 100
+
+@pytest.fixture
+def server(tmp_path: Path):
+    (tmp_path / "index.html").write_text("<html></html>")
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "index-abc123.js").write_text(SCRIPT)
+    (tmp_path / "assets" / "names-BZ3kd9_a.js").write_text(LARGE_SCRIPT)
+
+    server: LocalServer = LocalServer(tmp_path)
+    server.run()
+
+    yield server
+
+    server.close()
+
+def test_keep_alive(server: LocalServer):
+    conn: HTTPConnection = HTTPConnection("127.0.0.1", server.port, timeout=5)
+
+    bodies: list[bytes] = []
+    for path in ["/index.html", "/assets/index-abc123.js"]:
+        conn.request("GET", path)
+        res: HTTPResponse = conn.getresponse()
+        bodies.append(res.read())
+
+        assert res.status == 200 and not res.will_close
+
+    conn.close()
+
+    assert bodies == [b"<html></html>", SCRIPT.encode()]
+
+def test_parallel_connections(server: LocalServer):
+    # an idle kept alive connection must not block the other connections.
+    idle_conn: HTTPConnection = HTTPConnection("127.0.0.1", server.port, timeout=5)
+    idle_conn.request("GET", "/index.html")
+    idle_conn.getresponse().read()
+
+    conn: HTTPConnection = HTTPConnection("127.0.0.1", server.port, timeout=5)
+    conn.request("GET", "/assets/index-abc123.js")
+    res: HTTPResponse = conn.getresponse()
+
+    assert res.status == 200 and res.read() == SCRIPT.encode()
+
+    conn.close()
+    idle_conn.close()
+
+def get(server: LocalServer, path: str, headers: dict[str, str] = {}) -> tuple[HTTPResponse, bytes]:
+    conn: HTTPConnection = HTTPConnection("127.0.0.1", server.port, timeout=5)
+    conn.request("GET", path, headers=headers)
+
+    res: HTTPResponse = conn.getresponse()
+    body: bytes = res.read()
+
+    conn.close()
+
+    return res, body
+
+def test_cached_gzip(server: LocalServer):
+    res, body = get(server, "/assets/names-BZ3kd9_a.js", {"Accept-Encoding": "br;q=0, gzip, deflate"})
+    plain_res, plain_body = get(server, "/assets/names-BZ3kd9_a.js")
+
+    assert res.getheader("Content-Encoding") == "gzip" and gzip.decompress(body) == LARGE_SCRIPT.encode() \
+        and "immutable" in res.getheader("Cache-Control") and res.getheader("Vary") == "Accept-Encoding" \
+        and res.getheader("Content-Type") == "text/javascript"
+    assert plain_res.getheader("Content-Encoding") is None and plain_body == LARGE_SCRIPT.encode() \
+        and plain_res.getheader("ETag") != res.getheader("ETag")
+
+def test_cached_etag(server: LocalServer):
+    res, _ = get(server, "/")
+    cached_res, body = get(server, "/", {"If-None-Match": res.getheader("ETag")})
+
+    assert res.status == 200 and res.getheader("Cache-Control") == "no-cache" \
+        and cached_res.status == 304 and body == b""
+
+def test_uncached_file(server: LocalServer, tmp_path: Path):
+    # files added after the start are read from the disk.
+    (tmp_path / "new.txt").write_text("new")
+
+    res, body = get(server, "/new.txt")
+    missing_res, _ = get(server, "/missing.txt")
+
+    assert res.status == 200 and body == b"new" and missing_res.status == 404
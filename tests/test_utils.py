@@ -1,7 +1,12 @@
 from typing import Any
-from backend.support.types import Response
+from backend.support.types import Response, CacheStats, OpcoResolution
+from backend.core.names import NameCache, NameFormatter, Period, NoSpace
+from backend.core.template import Template
+from backend.core.username_index import UsernameIndex, number_usernames
 from pathlib import Path
 import backend.support.utils as utils
+import pandas as pd
+import string
 
 def test_hyphen_name_format():
     base_names: list[str] = [
@@ -73,6 +78,25 @@ def test_generate_text_invalid():
 
     assert res["status"] == "error"
 
+def test_template_render_many():
+    template: Template = Template("  [NAME] logs in with [USERNAME] and [PASSWORD], [NAME]. [name] ")
+    rows: list[tuple[str, str, str]] = [
+        ("john.doe@gmail.com", "[PASSWORD]", "john doe"),
+        ("jane.doe@gmail.com", "SomePasswordHere", "jane doe"),
+    ]
+
+    texts: list[str] = list(template.render_many(rows))
+
+    assert template.is_valid()
+    # values are not replaced again if they contain a key word.
+    assert texts[0] == "John Doe logs in with john.doe@gmail.com and [PASSWORD], John Doe. [name]"
+    assert texts[1] == utils.generate_text(
+        text=template.text, username=rows[1][0], password=rows[1][1], name=rows[1][2]
+    )["content"]
+
+    assert list(Template("no key words").render_many(rows)) == ["no key words", "no key words"]
+    assert not Template("a" * 1251).is_valid()
+
 def test_invalid_name():
     name: str = utils.format_name(" ")
 
@@ -176,4 +200,127 @@ def test_invalid_arg_compare_version():
     args: list[str] = ["v.1.0.0", "v1.0.0aa", "", "test_example", "v1.0.b"]
 
     for arg in args:
-        assert utils.compare_version(base, arg) == False
\ No newline at end of file
+        assert utils.compare_version(base, arg) == False
+
+def test_format_names():
+    names: list[str] = [
+        "John Doe", "  jane   mary-ann DOE jr.  ", "O'Brien 3rd Smith", "Kyle", "", "!!! 123",
+        "The Duke of Earl", "José Núñez", "Alice Bob Carol Dave", "x y z",
+    ]
+
+    exp_names: list[str] = [
+        "John Doe", "Jane Doe", "Obrien Smith", "Kyle Kyle", "Invalid Name", "Invalid Name",
+        "Duke Earl", "Invalid Name", "Alice Dave", "Invalid Name",
+    ]
+    # a single word keeps an empty first name, the same as format_name(keep_full=True).
+    exp_full_names: list[str] = [
+        "John Doe", "Jane Mary-Ann Doe", "Obrien Rd Smith", " Kyle", "Invalid Name", "Invalid Name",
+        "Duke Earl", "Invalid Name", "Alice Bob Carol Dave", "Invalid Name",
+    ]
+
+    new_names, new_full_names = utils.format_names(names)
+
+    assert new_names == exp_names and new_full_names == exp_full_names
+
+def test_format_name_unicode_digits():
+    # the same digits as str.isdigit are removed, e.g. superscripts and Arabic-Indic digits.
+    assert utils.format_names(["Jo²hn Do٣e", "Mary An¹ne Doe"]) == (["John Doe", "Mary Doe"], ["John Doe", "Mary Anne Doe"])
+
+def test_name_cache():
+    cache: NameCache = NameCache(2)
+
+    names: list[str] = ["John Doe", "Jane Doe", "John Doe"]
+    first_names, _ = utils.format_names(names, cache=cache)
+
+    # evicts jane doe, john doe was used last
+    cache.get("John Doe")
+    utils.format_names(["Kyle Shanks"], cache=cache)
+
+    stats: CacheStats = cache.get_stats()
+
+    assert first_names == ["John Doe", "Jane Doe", "John Doe"] and stats["size"] == 2 \
+        and cache.get("Jane Doe") is None and cache.get("John Doe") is not None
+
+def test_generate_passwords():
+    settings: dict[str, Any] = {"length": 12, "use_punctuations": False, "use_uppercase": False, "use_numbers": True}
+    passwords: list[str] = utils.generate_passwords(1000, settings)
+
+    for password in passwords:
+        upper_count: int = sum(c in string.ascii_uppercase for c in password)
+        special_count: int = sum(c in string.punctuation for c in password)
+
+        # only one upper and special is guaranteed, the rest are disabled
+        assert len(password) == 12 and upper_count == 1 and special_count == 1 \
+            and any(c in string.ascii_lowercase for c in password)
+
+    assert len(set(passwords)) == len(passwords)
+
+def test_resolve_opcos():
+    opco_map: dict[str, str] = {"default": "default.com", "company one": "companyone.com", "company two": "companytwo.com"}
+    opcos: list[str] = ["company one", "unknown", "company two", "company one", "", "unknown"]
+
+    resolution: OpcoResolution = utils.resolve_opcos(opcos, opco_map)
+
+    assert resolution["domains"] == [opco_map.get(opco, opco_map["default"]) for opco in opcos]
+    assert resolution["counts"] == {"company one": 2, "unknown": 2, "company two": 1, "": 1}
+    assert resolution["unknown"] == ["unknown", ""]
+
+    assert utils.resolve_opcos([], opco_map) == {"domains": [], "counts": {}, "unknown": []}
+
+def test_name_formatter_series():
+    names: list[str] = [
+        "John Doe", "jane middle doe", "Madonna", "John  Middle\tDoe", "o'neil smith", "JANE DOE", "J D",
+    ]
+    series: pd.Series = pd.Series(names, dtype=object)
+
+    for formatter_cls in [Period, NoSpace]:
+        for case_ in ["title", "lower", "upper"]:
+            formatter: NameFormatter = formatter_cls(case_)
+
+            assert formatter.replace_series(series).to_list() == [formatter.replace(name) for name in names]
+            assert formatter.f_last_series(series).to_list() == [formatter.f_last(name) for name in names]
+            assert formatter.first_l_series(series).to_list() == [formatter.first_l(name) for name in names]
+
+def test_generate_usernames_vectorize():
+    names: list[str] = [
+        "John Doe", "jane middle doe", "Madonna", "John-Doe Smith", "John Doe-Smith", 
+        " John  Middle\tDoe ", "o'neil smith", "Jane Doe", "John Doe",
+    ]
+    opcos: list[str] = ["company one" for _ in range(len(names))]
+    opco_map: dict[str, str] = {"default": "default.com", "company one": "companyone.com"}
+    cache: NameCache = NameCache(100)
+
+    for format_type in ["period", "no space"]:
+        for format_style in ["first last", "f last", "first l"]:
+            for format_case in ["title", "lower", "upper"]:
+                kwargs: dict[str, str] = {
+                    "format_type": format_type, "format_style": format_style, "format_case": format_case
+                }
+
+                usernames: list[str] = utils.generate_usernames(names, opcos, opco_map, vectorize=False, **kwargs)
+                
+                assert utils.generate_usernames(names, opcos, opco_map, vectorize=True, **kwargs) == usernames
+                # the second call uses the cached usernames.
+                for _ in range(2):
+                    assert utils.generate_usernames(
+                        names, opcos, opco_map, vectorize=True, cache=cache, **kwargs
+                    ) == usernames
+
+def test_username_index_assign(tmp_path: Path):
+    index: UsernameIndex = UsernameIndex(tmp_path / "usernames.db")
+    index.add_many(["John.Doe@gmail.com", "john.doe1@gmail.com"])
+
+    # more than one lookup of numbers is needed.
+    index.add_many([f"jane.doe{i}@gmail.com" for i in range(1, 40)])
+
+    usernames: list[str] = index.assign(
+        ["John.Doe@gmail.com", "JOHN.DOE@gmail.com", "Jane.Doe@gmail.com", "Jane.Doe@gmail.com", "Jim.Doe@gmail.com"]
+    )
+
+    assert usernames == [
+        "John.Doe2@gmail.com", "JOHN.DOE3@gmail.com", "Jane.Doe@gmail.com", "Jane.Doe40@gmail.com", "Jim.Doe@gmail.com"
+    ]
+    assert not index.contains("Jane.Doe@gmail.com") and index.contains("JOHN.DOE@GMAIL.COM")
+    assert number_usernames(["a@x.com", "A@x.com", "a1@x.com"]) == ["a@x.com", "A1@x.com", "a11@x.com"]
+
+    index.close()
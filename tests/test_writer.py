@@ -1,8 +1,11 @@
 from backend.core.azure_writer import AzureWriter
 from pathlib import Path
-from backend.support.vars import DEFAULT_OPCO_MAP
+from backend.support.vars import DEFAULT_OPCO_MAP, AZURE_VERSION, AZURE_HEADERS
 from backend.support.types import Response
 import backend.support.utils as utils
+import zipfile, tarfile
+import pytest
+import pandas as pd
 
 names: list[str] = ["John Doe", "Jane Doe", "Krane Doe"]
 usernames: list[str] = utils.generate_usernames(names, ["" for _ in range(len(names))], DEFAULT_OPCO_MAP)
@@ -42,6 +45,61 @@ def test_write_text(tmp_path: Path):
         if not write_status:
             raise AssertionError(f"Failed to write to file for {file.name}: {content}")
 
+def test_write_text_workers(tmp_path: Path):
+    writer: AzureWriter = AzureWriter(project_root=tmp_path)
+
+    bulk_names: list[str] = [f"{name} {i}" for i in range(50) for name in names]
+
+    writer.set_full_names(bulk_names)
+    writer.set_usernames([f"user{i}" for i in range(len(bulk_names))])
+    writer.set_passwords([utils.generate_password(20) for _ in range(len(bulk_names))])
+
+    res: Response = writer.write_template(tmp_path, text=text, workers=4)
+
+    assert res["status"] == "success"
+
+    files: list[Path] = list(Path(res["output_dir"]).iterdir())
+
+    assert len(files) == len(bulk_names)
+    # no temporary files should be left behind from the threads
+    assert len([file for file in tmp_path.iterdir() if file.is_file()]) == 0
+
+    for file in files:
+        name: str = file.name.rsplit("-", 1)[0]
+
+        assert name in file.read_text()
+
+@pytest.mark.parametrize("archive", ["zip", "tar"])
+def test_write_text_archive(tmp_path: Path, archive: str):
+    writer: AzureWriter = AzureWriter(project_root=tmp_path)
+
+    writer.set_full_names(names)
+    writer.set_usernames(usernames)
+    writer.set_passwords(passwords)
+
+    # the second write adds to the same archive, same as flatten CSV.
+    for _ in range(2):
+        res: Response = writer.write_template(tmp_path, text=text, file_name="test", archive=archive)
+
+        assert res["status"] == "success"
+
+    archive_path: Path = Path(res["output_file"])
+
+    assert archive_path.parent == tmp_path / "templates"
+    assert [file.name for file in archive_path.parent.iterdir()] == [archive_path.name]
+
+    if archive == "zip":
+        with zipfile.ZipFile(archive_path) as zip_file:
+            contents: list[str] = [zip_file.read(name).decode() for name in zip_file.namelist()]
+    else:
+        with tarfile.open(archive_path) as tar_file:
+            contents = [tar_file.extractfile(member).read().decode() for member in tar_file.getmembers()]
+    
+    assert len(contents) == len(names) * 2
+
+    for i, name in enumerate(names):
+        assert sum(name in content and usernames[i] in content for content in contents) == 2
+
 def test_fail_write_csv_no_names(tmp_path: Path):
     writer: AzureWriter = AzureWriter(project_root=tmp_path)
 
@@ -70,4 +128,91 @@ def test_fail_write_csv_no_passwords(tmp_path: Path):
 
     res: Response = writer.write_template(tmp_path, text=text)
 
-    assert res["status"] == "error"
\ No newline at end of file
+    assert res["status"] == "error"
+
+def test_write_append(tmp_path: Path):
+    csv_path: Path = tmp_path / "out.csv"
+
+    for _ in range(3):
+        writer: AzureWriter = AzureWriter(project_root=tmp_path)
+
+        writer.set_full_names(names)
+        writer.set_names(names)
+        writer.set_usernames(usernames)
+        writer.set_passwords(passwords)
+        writer.set_block_sign_in(len(names), [])
+
+        res: Response = writer.write(csv_path, skip_version=csv_path.exists())
+
+        assert res["status"] == "success"
+
+    with open(csv_path, "r") as file:
+        content: list[str] = file.readlines()
+
+    # version row and headers
+    assert len(content) == len(names) * 3 + 2 and content[0].strip() == AZURE_VERSION \
+        and not (tmp_path / "out.csv.journal").exists()
+
+def test_write_recover_journal(tmp_path: Path):
+    csv_path: Path = tmp_path / "out.csv"
+
+    writer: AzureWriter = AzureWriter(project_root=tmp_path)
+    writer.set_full_names(names)
+    writer.set_names(names)
+    writer.set_usernames(usernames)
+    writer.set_passwords(passwords)
+    writer.set_block_sign_in(len(names), [])
+
+    writer.write(csv_path)
+
+    with open(csv_path, "r") as file:
+        base_content: str = file.read()
+
+    # simulates a failed append
+    with open(tmp_path / "out.csv.journal", "w") as file:
+        file.write(str(csv_path.stat().st_size))
+
+    with open(csv_path, "a") as file:
+        file.write("John Doe,John.Doe@")
+
+    writer.write(csv_path, skip_version=True)
+
+    with open(csv_path, "r") as file:
+        content: str = file.read()
+
+    assert "John.Doe@\n" not in content and content.startswith(base_content) \
+        and len(content.splitlines()) == len(names) * 2 + 2
+
+def test_write_matches_pandas(tmp_path: Path):
+    writer: AzureWriter = AzureWriter(project_root=tmp_path)
+    quoted_names: list[str] = ['John "Johnny" Doe', "Jane, Doe"]
+
+    writer.set_full_names(quoted_names)
+    writer.set_names(quoted_names)
+    writer.set_usernames(["John.Doe@gmail.com", "Jane.Doe@gmail.com"])
+    writer.set_passwords(['pass"word', "pass,word"])
+    writer.set_block_sign_in(len(quoted_names), [])
+
+    res: Response = writer.write(tmp_path / "out.csv", skip_version=True)
+
+    assert res["status"] == "success"
+
+    with open(tmp_path / "out.csv", "r", newline="") as file:
+        content: str = file.read()
+
+    df: pd.DataFrame = pd.DataFrame({header: writer.get_data(header) for header in AZURE_HEADERS.values()})
+
+    assert content == df.to_csv(index=False)
+
+def test_fail_write_csv_column_length(tmp_path: Path):
+    writer: AzureWriter = AzureWriter(project_root=tmp_path)
+
+    writer.set_full_names(names)
+    writer.set_names(names)
+    writer.set_usernames(usernames[:-1])
+    writer.set_passwords(passwords)
+    writer.set_block_sign_in(len(names), [])
+
+    res: Response = writer.write(tmp_path / "out.csv")
+
+    assert res["status"] == "error" and not (tmp_path / "out.csv").exists()
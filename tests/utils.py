@@ -1,5 +1,7 @@
 from pathlib import Path
 from io import BytesIO
+from base64 import b64encode
+import pandas as pd
 import random
 
 def randomizer(_: str, *args) -> str:
@@ -33,4 +35,24 @@ def get_csv(path: Path, *, ignore_files: list[Path] = []) -> Path | None:
             if file.name.lower() not in ignore:
                 return file
     
-    return None
\ No newline at end of file
+    return None
+
+def get_b64_csv(df: pd.DataFrame, file_name: str = "test.csv") -> dict[str, str]:
+    '''Converts a DataFrame into the upload content sent from the frontend, being a
+    CSV data URL.'''
+    b64: str = b64encode(df.to_csv(index=False).encode()).decode()
+
+    return {"fileName": file_name, "b64": f"data:text/csv;base64,{b64}"}
+
+def get_b64_excel(df: pd.DataFrame, file_name: str = "test.xlsx") -> dict[str, str]:
+    '''Converts a DataFrame into the upload content sent from the frontend, being an
+    Excel data URL.'''
+    buffer: BytesIO = BytesIO()
+    df.to_excel(buffer, index=False)
+
+    b64: str = b64encode(buffer.getvalue()).decode()
+
+    return {
+        "fileName": file_name, 
+        "b64": f"data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}"
+    }